@@ -11,7 +11,7 @@ setup(
     author="Evgeny Odegov",
     author_email="evg.odegov@gmail.com",
     packages=find_packages(),
-    install_requires=["decorator"],
+    python_requires=">=3.6",
     test_suite="valideero.tests",
     platforms=["any"],
     keywords="validation adaptation typechecking jsonschema",
@@ -19,11 +19,12 @@ setup(
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
         "Operating System :: OS Independent",
-        "Programming Language :: Python :: 2",
-        "Programming Language :: Python :: 2.7",
-        "Programming Language :: Python :: 3.4",
-        "Programming Language :: Python :: 3.5",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
         "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
         "Topic :: Software Development :: Libraries :: Python Modules",
         "License :: OSI Approved :: MIT License",
     ],
@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
-from __future__ import unicode_literals
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from threading import Lock
 
-import inspect
-
-from .compat import iteritems, python_2_unicode_compatible, compatible_repr, unicode_safe, imap, string_types, xrange
+from .compat import compatible_repr, unicode_safe
 
 __all__ = ["ValidationError", "SchemaError", "Validator", "ValidationContext", "UNDEFINED", "TypeNames"]
 
 
-@python_2_unicode_compatible
 class SchemaError(Exception):
     """An object cannot be parsed as a validator."""
 
+    __slots__ = ("_msg",)
+
     def __init__(self, msg):
         self._msg = msg
 
@@ -23,8 +24,9 @@ class SchemaError(Exception):
         return self.__str__()
 
 
-@python_2_unicode_compatible
 class ValidatorTypeError(TypeError):
+    __slots__ = ("_msg",)
+
     def __init__(self, msg):
         self._msg = msg
 
@@ -39,33 +41,61 @@ class ValidatorTypeError(TypeError):
 UNDEFINED = object()
 
 
-@python_2_unicode_compatible
 class ValidationError(ValueError):
-    """A value is invalid for a given validator."""
+    """A value is invalid for a given validator.
+
+    ``msg`` can also be a zero-argument callable returning the message. It is
+    called only when the message is needed, so errors that are caught and
+    discarded (e.g. by :py:meth:`Validator.is_valid`) don't pay for formatting.
+    """
+
+    __slots__ = ("val_context", "_msg", "value", "error_path", "_text")
 
     def __init__(self, val_context, msg, value=UNDEFINED):
         self.val_context = val_context
-        self.msg = unicode_safe(msg)
+        self._msg = msg
         self.value = value
-        self.error_path_items = []
+        #: The path to the invalid value as an ``(item, parent_path)`` linked list,
+        #: starting from the outermost item, or ``None``
+        self.error_path = None
+        self._text = None
         super(ValidationError, self).__init__()
 
+    @property
+    def msg(self):
+        msg = self._msg
+        if not isinstance(msg, str):
+            msg = self._msg = unicode_safe(msg() if callable(msg) else msg)
+        return msg
+
+    @msg.setter
+    def msg(self, msg):
+        self._msg = msg
+        self._text = None
+
     def to_text(self):
+        if self._text is None:
+            self._text = self._render_text()
+        return self._text
+
+    def _render_text(self):
+        _repr = self.val_context.repr
         if self.value is not UNDEFINED:
-            value = self.val_context.repr(self.value)
+            value = _repr(self.value)
             type_name = self.val_context.type_names.get_type_name(self.value.__class__)
             message = "Invalid value {} ({}): {}".format(value, type_name, self.msg)
         else:
             message = self.msg
-        if len(self.error_path_items) > 0:
-            path_items = [item for item in reversed(self.error_path_items)]
-            if not isinstance(path_items[0], string_types):
-                path_items.insert(0, "value")
-            else:
-                path_items[0] = unicode_safe(path_items[0])
-            for n in xrange(1, len(path_items)):
-                path_items[n] = "[{}]".format(self.val_context.repr(path_items[n]))
-            message += " (at {})".format("".join(path_items))
+        path = self.error_path
+        if path is not None:
+            root, path = path
+            if not isinstance(root, str):
+                root, path = "value", self.error_path
+            items = []
+            while path is not None:
+                item, path = path
+                items.append("[{}]".format(_repr(item)))
+            message += " (at {}{})".format(root, "".join(items))
         return message
 
     def __str__(self):
@@ -73,20 +103,49 @@ class ValidationError(ValueError):
 
     @property
     def message(self):
-        return self.__str__()
+        return self.to_text()
 
     @property
     def args(self):
-        return (self.__str__(), )
+        return (self.to_text(), )
+
+    @property
+    def error_path_items(self):
+        """The items of the error path as a list, from the innermost one.
+
+        The list is built from :py:attr:`error_path` on each access, so changing
+        it in place doesn't change the error; assign it or use
+        :py:meth:`add_error_path_item` instead.
+        """
+        items = []
+        path = self.error_path
+        while path is not None:
+            item, path = path
+            items.append(item)
+        items.reverse()
+        return items
+
+    @error_path_items.setter
+    def error_path_items(self, items):
+        path = None
+        for item in items:
+            path = (item, path)
+        self.error_path = path
+        self._text = None
 
     def add_error_path_item(self, context):
-        self.error_path_items.append(context)
+        self.error_path = (context, self.error_path)
+        self._text = None
         return self
 
 
 class TypeNames(object):
+    __slots__ = ("_type_names", "_resolved", "_formatted")
+
     def __init__(self):
         self._type_names = {}
+        self._resolved = {}
+        self._formatted = {}
 
     def set_name_for_types(self, name, *types):
         """
@@ -94,44 +153,236 @@ class TypeNames(object):
         """
         for _type in types:
             self._type_names[_type] = name
+            self._resolved.pop(_type, None)
+        self._formatted.clear()
 
     def get_type_name(self, type):
-        return unicode_safe(self._type_names.get(type) or type.__name__)
+        name = self._resolved.get(type)
+        if name is None:
+            name = self._resolved[type] = unicode_safe(self._type_names.get(type) or type.__name__)
+        return name
 
     def format_types(self, types):
-        if inspect.isclass(types):
+        if isinstance(types, type):
             types = (types,)
-        names = list(imap(self.get_type_name, types))
+        try:
+            return self._formatted[types]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable, e.g. a list of types
+            return self._format_types(types)
+        s = self._formatted[types] = self._format_types(types)
+        return s
+
+    def _format_types(self, types):
+        names = list(map(self.get_type_name, types))
         s = names[-1]
         if len(names) > 1:
             s = "{} or {}".format(", ".join(names[:-1]), s)
         return s
 
 
+class _LRUCache(object):
+    """A minimal mapping that discards the least recently used items when full.
+
+    It can be used from several threads, as the items are reordered and
+    discarded under a lock.
+    """
+
+    __slots__ = ("maxsize", "_items", "_lock")
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            if len(self._items) >= self.maxsize:
+                self._items.popitem(last=False)
+            self._items[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class _FactoriesMapping(MutableMapping):
+    """The factories of a :py:class:`ValidationContext` by name.
+
+    Changes are written to the factories dict of the context and discard the
+    validators that it has cached.
+    """
+
+    __slots__ = ("_context",)
+
+    def __init__(self, context):
+        self._context = context
+
+    def __getitem__(self, name):
+        return self._context._validators_factories[name]
+
+    def __setitem__(self, name, factory):
+        self._context._validators_factories[name] = factory
+        self._context.clear_cache()
+
+    def __delitem__(self, name):
+        del self._context._validators_factories[name]
+        self._context.clear_cache()
+
+    def __iter__(self):
+        return iter(self._context._validators_factories)
+
+    def __len__(self):
+        return len(self._context._validators_factories)
+
+    def __repr__(self):
+        return repr(self._context._validators_factories)
+
+
+def _cache_key(obj):
+    """Return a structural key for hashable schemas and an identity key otherwise."""
+    key = (obj.__class__, obj)
+    try:
+        hash(key)
+    except TypeError:
+        key = id(obj)
+    return key
+
+
+# incremented whenever a factory option that changes the parsed validators is set
+_parsing_options_version = 0
+
+
+def _parsing_options_changed():
+    """Invalidate the cached validators of all the contexts.
+
+    Factories call it when one of their options changes, since it changes
+    the validators that they create.
+    """
+    global _parsing_options_version
+    _parsing_options_version += 1
+
+
+# types of schemas that can be looked up in named validators without hashing errors
+_HASHABLE_ATOMS = frozenset([str, bytes, int, type])
+# types of schemas that are never named validators
+_UNHASHABLE_SCHEMAS = frozenset([dict, list])
+
+
 class ValidationContext(object):
+    __slots__ = ("type_names", "named_validators", "_validators_factories", "repr",
+                 "_parse_cache", "_compile_cache", "_factories_by_type", "_cache_version")
+
+    #: The maximum number of parsed and compiled schemas to keep cached
+    cache_size = 1024
+
     def __init__(self, type_names, named_validators, validators_factories, repr_method):
         self.type_names = type_names
         self.named_validators = named_validators
-        self.validators_factories = validators_factories
+        self._validators_factories = validators_factories
         self.repr = repr_method
+        self._parse_cache = _LRUCache(self.cache_size)
+        self._compile_cache = _LRUCache(self.cache_size)
+        self._factories_by_type = {}
+        self._cache_version = _parsing_options_version
+
+    def __getstate__(self):
+        # the caches are rebuilt on demand and may hold compiled functions
+        return self.type_names, self.named_validators, self._validators_factories, self.repr
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def validators_factories(self):
+        """The mapping of the registered factories by name.
+
+        Setting or deleting its items discards the cached validators, while the
+        dict that was passed to the constructor must not be changed directly
+        afterwards (or :py:meth:`clear_cache` must be called).
+        """
+        return _FactoriesMapping(self)
+
+    @validators_factories.setter
+    def validators_factories(self, validators_factories):
+        self._validators_factories = validators_factories
+        self.clear_cache()
 
     def register(self, name, validator):
         if not isinstance(validator, Validator):
-            raise ValidatorTypeError("Validator instance expected, {} given".format(unicode_safe(validator.__class__)))
+            raise ValidatorTypeError("Validator instance expected, {} given".format(validator.__class__))
         self.named_validators[name] = validator
+        self.clear_cache()
 
-    def _get_validator(self, obj):
-        validator = None
+    def register_factory(self, name, factory):
+        """Register a validator factory under the given ``name``.
+
+        A factory is a callable that returns a :py:class:`Validator` for the
+        objects it can parse and ``None`` for any other object. It may declare
+        the types of objects it can parse in a ``schema_types`` attribute
+        (a tuple of types), so that it is never called for objects of other
+        types. Factories without ``schema_types`` are tried for every object.
+        """
+        self._validators_factories[name] = factory
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Discard all the cached results of :py:meth:`parse` and :py:meth:`compile`.
+
+        It must be called after changing the named validators of this context
+        directly, otherwise schemas that have been parsed already
+        keep their previous meaning. It is called automatically when an option of
+        the :py:class:`~valideero.validators.ObjectFactory` changes.
+        """
+        self._parse_cache.clear()
+        self._compile_cache.clear()
+        self._factories_by_type.clear()
+        self._cache_version = _parsing_options_version
+
+    def _get_factories(self, obj_type):
+        """Return the factories that may parse objects of ``obj_type``, in search order."""
         try:
-            validator = self.named_validators[obj]
-        except (KeyError, TypeError):
-            for _, factory in iteritems(self.validators_factories):
+            return self._factories_by_type[obj_type]
+        except KeyError:
+            pass
+        factories = []
+        for factory in self._validators_factories.values():
+            schema_types = getattr(factory, "schema_types", None)
+            if schema_types is None or issubclass(obj_type, schema_types):
+                factories.append(factory)
+        factories = self._factories_by_type[obj_type] = tuple(factories)
+        return factories
+
+    def _get_validator(self, obj):
+        obj_type = type(obj)
+        if obj_type in _HASHABLE_ATOMS:
+            validator = self.named_validators.get(obj)
+        elif obj_type in _UNHASHABLE_SCHEMAS:
+            validator = None
+        else:
+            try:
+                validator = self.named_validators.get(obj)
+            except TypeError:  # unhashable
+                validator = None
+
+        if validator is None:
+            for factory in self._get_factories(obj_type):
                 validator = factory(obj)
                 if validator is not None:
                     break
-        else:
-            if inspect.isclass(validator) and issubclass(validator, Validator):
-                self.named_validators[obj] = validator = validator()
+        elif isinstance(validator, type) and issubclass(validator, Validator):
+            self.named_validators[obj] = validator = validator()
         return validator
 
     def parse(self, obj):
@@ -149,6 +400,15 @@ class ValidationContext(object):
               order. The caller is responsible for ensuring there are no ambiguous
               values that can be parsed by more than one factory.
 
+        The parsed validators are cached per schema, so parsing the same schema
+        again is cheap and returns the same validator. Schemas that are not
+        hashable (e.g. dicts) are cached by identity. See :py:meth:`clear_cache`.
+
+        .. warning:: A schema that is changed after it has been parsed, e.g. a
+            dict schema that gets a new property, is still parsed to the cached
+            validator of its previous content. Parse a new schema object instead,
+            or call :py:meth:`clear_cache` after the change.
+
         :raises SchemaError: If no appropriate validator could be found.
 
         .. warning:: Passing ``required_properties`` and/or ``additional_properties``
@@ -180,10 +440,20 @@ class ValidationContext(object):
                         })
                     })
         """
-
         if isinstance(obj, Validator):
-            validator = obj
-        elif inspect.isclass(obj) and issubclass(obj, Validator):
+            obj.set_validation_context(self)
+            obj.parse()
+            obj.freeze()
+            return obj
+
+        if self._cache_version != _parsing_options_version:
+            self.clear_cache()
+        key = _cache_key(obj)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            return cached[1]
+
+        if isinstance(obj, type) and issubclass(obj, Validator):
             validator = obj()
         else:
             validator = self._get_validator(obj)
@@ -193,9 +463,69 @@ class ValidationContext(object):
 
         validator.set_validation_context(self)
         validator.parse()
+        validator.freeze()
 
+        # keep a reference to obj so that its id is not reused
+        self._parse_cache.set(key, (obj, validator))
         return validator
 
+    def compile(self, obj):
+        """Parse the given ``obj`` and return a callable that validates a value.
+
+        The returned callable is equivalent to the ``validate`` method of
+        ``self.parse(obj)`` but it may be specialized for the parsed schema
+        (see :py:meth:`Validator.compile`). The result is cached like the result
+        of :py:meth:`parse`, so compiling the same schema again is cheap.
+
+        :raises SchemaError: If no appropriate validator could be found.
+        """
+        if self._cache_version != _parsing_options_version:
+            self.clear_cache()
+        key = _cache_key(obj)
+        cached = self._compile_cache.get(key)
+        if cached is not None:
+            return cached[1]
+        validate = self.parse(obj).compile()
+        # keep a reference to obj so that its id is not reused
+        self._compile_cache.set(key, (obj, validate))
+        return validate
+
+    def emit(self, obj):
+        """Parse the given ``obj`` and return the source generated for it by :py:meth:`compile`.
+
+        This is meant for inspecting the specialized code; the names that it refers
+        to are bound to the function defaults by :py:meth:`compile`.
+
+        :returns: The source of the generated function or ``None`` if the parsed
+            validator is not specialized by code generation.
+        :raises SchemaError: If no appropriate validator could be found.
+        """
+        emitted = self.parse(obj).emit()
+        if emitted is None:
+            return None
+        return _function_source("validate", *emitted)
+
+
+def _function_source(name, body_lines, namespace):
+    """Return the source of a one-argument function with the given body lines.
+
+    All the names from ``namespace`` are bound to keyword-only default arguments
+    of the function, so they are accessed as fast locals within the function body
+    and extra positional arguments are rejected.
+    """
+    params = ["value"]
+    if namespace:
+        params.append("*")
+        params.extend("{0}={0}".format(n) for n in sorted(namespace))
+    return "def {}({}):\n{}\n".format(name, ", ".join(params), "\n".join(body_lines))
+
+
+def _make_function(name, body_lines, namespace):
+    """Generate a one-argument function from the given body source lines."""
+    source = _function_source(name, body_lines, namespace)
+    exec(compile(source, "<valideero {}>".format(name), "exec"), namespace)
+    return namespace[name]
+
 
 class Validator(object):
     """Abstract base class of all validators.
@@ -205,8 +535,20 @@ class Validator(object):
     a validator in :py:meth:`parse` instead of instantiating it explicitly.
     """
 
+    __slots__ = ("val_context",)
+
     name = None
 
+    #: Whether :py:meth:`validate` returns the valid values themselves, unchanged.
+    #: It is reset to ``False`` for subclasses that override :py:meth:`validate`
+    #: without setting it, as they may adapt the values.
+    is_pure = False
+
+    def __init_subclass__(cls, **kwargs):
+        super(Validator, cls).__init_subclass__(**kwargs)
+        if "validate" in cls.__dict__ and "is_pure" not in cls.__dict__:
+            cls.is_pure = False
+
     def __init__(self):
         self.val_context = None  # type: ValidationContext
 
@@ -216,9 +558,25 @@ class Validator(object):
         if self.val_context is None:
             self.val_context = context
 
+    def _overrides(self, cls):
+        """Check if the class of this validator overrides the ``validate`` method of ``cls``.
+
+        The checks and generated code that reimplement it can only stand in for
+        it if it is not overridden.
+        """
+        return type(self).validate is not cls.validate
+
     def parse(self):
         pass
 
+    def freeze(self):
+        """Precompute the state that :py:meth:`validate` needs from the parsed schema.
+
+        It is called by :py:meth:`ValidationContext.parse` after :py:meth:`parse`,
+        possibly more than once.
+        """
+        pass
+
     def validate(self, value):
         """Check if ``value`` is valid and if so adapt it.
 
@@ -228,9 +586,68 @@ class Validator(object):
         """
         raise NotImplementedError
 
+    def compile(self):
+        """Return a callable equivalent to :py:meth:`validate`.
+
+        If :py:meth:`emit` generates code for this validator, the function is
+        built from it, otherwise ``validate`` itself is returned. Subclasses may
+        also override it to return a function specialized for the parsed schema.
+        It must be called after :py:meth:`parse`.
+
+        The function is built anew on every call and is not kept by the validator,
+        which can be pickled and copied as usual. The generated code is specialized
+        for the current attributes of the validator and its children, so changing
+        them afterwards doesn't affect the functions that are already compiled
+        (use :py:meth:`ValidationContext.clear_cache` for the cached ones).
+        """
+        emitted = self.emit()
+        if emitted is None:
+            return self.validate
+        return _make_function("validate", *emitted)
+
+    def emit(self):
+        """Generate the code of a function equivalent to :py:meth:`validate`.
+
+        :returns: ``None`` if no code is generated for this validator, otherwise
+            a ``(body_lines, namespace)`` tuple. The body lines are indented source
+            lines validating the single argument ``value``; ``namespace`` maps
+            the other names they use to their values.
+        """
+        return None
+
+    def validate_many(self, values):
+        """Validate each of the given ``values``.
+
+        It is equivalent to calling :py:meth:`validate` on each value, but the
+        validation function is looked up once for all the values. It is the one
+        compiled and cached by the validation context, or :py:meth:`validate`
+        for validators without a context.
+
+        :raises ValidationError: If a value is invalid. Its index is added to the
+            error path.
+        :returns: The list of the validated (and possibly adapted) values.
+        """
+        if self.val_context is not None:
+            validate = self.val_context.compile(self)
+        else:
+            validate = self.validate
+        result = []
+        append = result.append
+        for i, value in enumerate(values):
+            try:
+                append(validate(value))
+            except ValidationError as ex:
+                raise ex.add_error_path_item(i)
+        return result
+
     def is_valid(self, value):
         """Check if the ``value`` is valid.
 
+        The messages of the errors raised while checking are never formatted.
+        Several validators override it with checks that raise no errors at all,
+        so it is the faster way to tell if a value is valid when neither the
+        adapted value nor the error is needed.
+
         :returns: ``True`` if the value is valid, ``False`` if invalid.
         """
         try:
@@ -244,9 +661,10 @@ class Validator(object):
 
         Can be overriden to provide customized :py:exc:`ValidationError` subclasses.
         """
-        raise ValidationError(self.val_context,
-                              "must be {}".format(self.humanized_name),
-                              value)
+        raise ValidationError(self.val_context, self._error_message, value)
+
+    def _error_message(self):
+        return "must be {}".format(self.humanized_name)
 
     @property
     def humanized_name(self):
@@ -1,79 +1,53 @@
 # -*- coding: utf-8 -*-
-import sys
+import reprlib
 
-PY2 = sys.version_info[0] == 2
-PY3 = sys.version_info[0] == 3
 
-if PY2:  # pragma: no cover
-    text_type = unicode
-    binary_type = str
-    string_types = basestring
-    int_types = (int, long)
-    import itertools
+class CompatRepr(reprlib.Repr):
+    def repr_bytes(self, x, level):
+        s = x.decode('utf8')
+        return reprlib.Repr.repr_str(self, s, level)
 
-    izip = itertools.izip
-    imap = itertools.imap
-    long = long
-    xrange = xrange
 
-    import repr as reprlib
+class _FastRepr(object):
+    """Format scalars of the given exact types directly, with ``repr_instance`` otherwise.
 
+    It is a class rather than a closure so that it can be pickled along with the
+    validation contexts that use it.
+    """
 
-    def iteritems(d, **kw):
-        return iter(d.iteritems(**kw))
-
-
-    class CompatRepr(reprlib.Repr):
-        def repr(self, x):
-            return reprlib.Repr.repr(self, x).decode('utf8')
-
-        def repr_unicode(self, x, level):
-            s = x.encode('utf8')
-            return reprlib.Repr.repr_str(self, s, level)
-
-
-    import __builtin__ as builtins
-
-else:  # pragma: no cover
-    text_type = str
-    binary_type = bytes
-    string_types = str
-    int_types = (int,)
-    izip = zip
-    imap = map
-    long = int
-
-
-    def iteritems(d, **kw):
-        return iter(d.items(**kw))
-
-
-    xrange = range
-
-    import reprlib
-
+    __slots__ = ("_slow_repr", "_maxlong", "_scalar_reprs")
 
-    class CompatRepr(reprlib.Repr):
-        def repr_bytes(self, x, level):
-            s = x.decode('utf8')
-            return reprlib.Repr.repr_str(self, s, level)
+    def __init__(self, repr_instance, scalar_reprs):
+        self._slow_repr = repr_instance.repr
+        self._maxlong = repr_instance.maxlong
+        self._scalar_reprs = scalar_reprs
 
+    def __call__(self, x):
+        x_type = type(x)
+        if x_type is int:
+            s = repr(x)
+            return s if len(s) <= self._maxlong else self._slow_repr(x)
+        scalar_repr = self._scalar_reprs.get(x_type)
+        return scalar_repr(x) if scalar_repr is not None else self._slow_repr(x)
 
-    import builtins
 
-compatible_repr = CompatRepr().repr
+compatible_repr = _FastRepr(CompatRepr(), {float: repr, bool: repr, type(None): repr})
 
 
-class JsonReprBase(reprlib.Repr):
+class JsonRepr(reprlib.Repr):
     def repr_str(self, x, level):
         s = '"{}"'.format(x)
         if len(s) > self.maxstring:
             i = max(0, (self.maxstring - 3) // 2)
             j = max(0, self.maxstring - 3 - i)
-            s = builtins.repr(x[:i] + x[len(x) - j:])
-            s = s[:i] + b'...' + s[len(s) - j:]
+            s = repr(x[:i] + x[len(x) - j:])
+            s = s[:i] + '...' + s[len(s) - j:]
         return s
 
+    def repr_bytes(self, x, level):
+        x = x.decode('utf8')
+        return self.repr_str(x, level)
+
     def repr_bool(self, x, level):
         return 'true' if x else 'false'
 
@@ -81,40 +55,19 @@ class JsonReprBase(reprlib.Repr):
         return 'null'
 
 
-if PY2:
-    class JsonRepr(JsonReprBase):
-        def repr(self, x):
-            return JsonReprBase.repr(self, x).decode('utf8')
-
-        def repr_unicode(self, x, level):
-            x = x.encode('utf8')
-            return JsonReprBase.repr_str(self, x, level)
-else:
-    class JsonRepr(JsonReprBase):
-        def repr_bytes(self, x, level):
-            x = x.decode('utf8')
-            return JsonReprBase.repr_str(self, x, level)
+def _json_bool_repr(x):
+    return 'true' if x else 'false'
 
-json_repr = JsonRepr().repr
 
+def _json_null_repr(x):
+    return 'null'
 
-def python_2_unicode_compatible(cls):
-    """
-    The implementation comes from django.utils.encoding.
 
-    """
-    if PY2:
-        if '__str__' not in cls.__dict__:
-            raise ValueError("@python_2_unicode_compatible cannot be applied "
-                             "to %s because it doesn't define __str__()." %
-                             cls.__name__)
-        cls.__unicode__ = cls.__str__
-        cls.__str__ = lambda self: self.__unicode__().encode('utf-8')
-    return cls
+json_repr = _FastRepr(JsonRepr(), {float: repr, bool: _json_bool_repr, type(None): _json_null_repr})
 
 
 def unicode_safe(x):
-    if isinstance(x, binary_type):
+    if isinstance(x, bytes):
         return x.decode('utf8')
     else:
         return x
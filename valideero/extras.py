@@ -1,6 +1,73 @@
 import inspect
+from collections import namedtuple
+from functools import wraps
 
-from decorator import decorator
+
+_Parameters = namedtuple("_Parameters", "positional, positional_only, kwonly, varargs, varkw, defaults")
+
+
+def _get_parameters(func):
+    """Return the parameter names of ``func`` grouped by kind, and its defaults."""
+    parameters = inspect.signature(func).parameters.values()
+    return _Parameters(
+        positional=tuple(p.name for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)),
+        positional_only=tuple(p.name for p in parameters if p.kind == p.POSITIONAL_ONLY),
+        kwonly=tuple(p.name for p in parameters if p.kind == p.KEYWORD_ONLY),
+        varargs=next((p.name for p in parameters if p.kind == p.VAR_POSITIONAL), None),
+        varkw=next((p.name for p in parameters if p.kind == p.VAR_KEYWORD), None),
+        defaults=dict((p.name, p.default) for p in parameters if p.default is not p.empty),
+    )
+
+
+def _make_binder(func, parameters=None):
+    """Build a ``bind(args, kwargs)`` callable mapping call arguments to parameter names.
+
+    It is equivalent to ``inspect.getcallargs(func, *args, **kwargs)`` but the
+    signature of ``func`` is parsed only once, when the binder is created.
+
+    :param parameters: The result of ``_get_parameters(func)`` if already known.
+    """
+    if parameters is None:
+        parameters = _get_parameters(func)
+    positional_names = parameters.positional
+    kwonly_names = parameters.kwonly
+    varargs = parameters.varargs
+    varkw = parameters.varkw
+    defaults = parameters.defaults
+    num_positional = len(positional_names)
+    keyword_names = frozenset(positional_names + kwonly_names).difference(parameters.positional_only)
+    required_names = tuple(name for name in positional_names + kwonly_names if name not in defaults)
+    optional_names = tuple(name for name in positional_names + kwonly_names if name in defaults)
+    func_name = func.__name__
+
+    def bind(args, kwargs):
+        if len(args) > num_positional and varargs is None:
+            raise TypeError("{}() takes {} positional arguments but {} were given".format(
+                func_name, num_positional, len(args)))
+        callargs = dict(zip(positional_names, args))
+        if varargs is not None:
+            callargs[varargs] = args[num_positional:]
+        extra_kwargs = {}
+        for name, value in kwargs.items():
+            if name in keyword_names:
+                if name in callargs:
+                    raise TypeError("{}() got multiple values for argument '{}'".format(func_name, name))
+                callargs[name] = value
+            elif varkw is not None:
+                extra_kwargs[name] = value
+            else:
+                raise TypeError("{}() got an unexpected keyword argument '{}'".format(func_name, name))
+        if varkw is not None:
+            callargs[varkw] = extra_kwargs
+        for name in required_names:
+            if name not in callargs:
+                raise TypeError("{}() missing required argument '{}'".format(func_name, name))
+        for name in optional_names:
+            if name not in callargs:
+                callargs[name] = defaults[name]
+        return callargs
+
+    return bind
 
 
 def accepts(validation_context, **schemas):
@@ -15,14 +82,19 @@ def accepts(validation_context, **schemas):
     :param validation_context:
     :param schemas: The schema for validating a given parameter.
     """
-    validate = validation_context.parse(schemas).validate
+    validate = validation_context.compile(schemas)
 
-    @decorator
-    def validating(func, *args, **kwargs):
-        validate(inspect.getcallargs(func, *args, **kwargs))
-        return func(*args, **kwargs)
+    def decorating(func):
+        bind = _make_binder(func)
 
-    return validating
+        @wraps(func)
+        def validating(*args, **kwargs):
+            validate(bind(args, kwargs))
+            return func(*args, **kwargs)
+
+        return validating
+
+    return decorating
 
 
 def returns(validation_context, schema):
@@ -37,15 +109,18 @@ def returns(validation_context, schema):
     :param validation_context:
     :param schema: The schema for adapting a given parameter.
     """
-    validate = validation_context.parse(schema).validate
+    validate = validation_context.compile(schema)
 
-    @decorator
-    def validating(func, *args, **kwargs):
-        ret = func(*args, **kwargs)
-        validate(ret)
-        return ret
+    def decorating(func):
+        @wraps(func)
+        def validating(*args, **kwargs):
+            ret = func(*args, **kwargs)
+            validate(ret)
+            return ret
 
-    return validating
+        return validating
+
+    return decorating
 
 
 def adapts(validation_context, **schemas):
@@ -60,26 +135,54 @@ def adapts(validation_context, **schemas):
     :param validation_context:
     :param schemas: The schema for adapting a given parameter.
     """
-    validate = validation_context.parse(schemas).validate
-
-    @decorator
-    def adapting(func, *args, **kwargs):
-        adapted = validate(inspect.getcallargs(func, *args, **kwargs))
-        argspec = inspect.getargspec(func)
-
-        if argspec.varargs is argspec.keywords is None:
+    validate = validation_context.compile(schemas)
+
+    def decorating(func):
+        parameters = _get_parameters(func)
+        bind = _make_binder(func, parameters)
+        arg_names = parameters.positional
+        # positional-only parameters can't be passed by keyword
+        posonly_names = parameters.positional_only
+        kwonly_names = parameters.kwonly
+        varargs = parameters.varargs
+        varkw = parameters.varkw
+
+        if varargs is None and varkw is None and not posonly_names:
             # optimization for the common no varargs, no keywords case
-            return func(**adapted)
-
-        adapted_varargs = adapted.pop(argspec.varargs, ())
-        adapted_keywords = adapted.pop(argspec.keywords, {})
-        if not adapted_varargs:  # keywords only
-            if adapted_keywords:
-                adapted.update(adapted_keywords)
-            return func(**adapted)
-
-        adapted_posargs = [adapted[arg] for arg in argspec.args]
-        adapted_posargs.extend(adapted_varargs)
-        return func(*adapted_posargs, **adapted_keywords)
-
-    return adapting
+            def adapting(*args, **kwargs):
+                return func(**validate(bind(args, kwargs)))
+
+        elif varargs is None and varkw is None:
+            def adapting(*args, **kwargs):
+                adapted = validate(bind(args, kwargs))
+                return func(*[adapted.pop(arg) for arg in posonly_names], **adapted)
+
+        elif varargs is None:  # keywords only
+            def adapting(*args, **kwargs):
+                adapted = validate(bind(args, kwargs))
+                adapted_keywords = adapted.pop(varkw, None)
+                adapted_posargs = [adapted.pop(arg) for arg in posonly_names]
+                if adapted_keywords:
+                    adapted.update(adapted_keywords)
+                return func(*adapted_posargs, **adapted)
+
+        else:
+            def adapting(*args, **kwargs):
+                adapted = validate(bind(args, kwargs))
+                adapted_varargs = adapted.pop(varargs, ())
+                adapted_keywords = adapted.pop(varkw, {}) if varkw is not None else {}
+                if not adapted_varargs:
+                    adapted_posargs = [adapted.pop(arg) for arg in posonly_names]
+                    if adapted_keywords:
+                        adapted.update(adapted_keywords)
+                    return func(*adapted_posargs, **adapted)
+
+                adapted_posargs = [adapted[arg] for arg in arg_names]
+                adapted_posargs.extend(adapted_varargs)
+                for arg in kwonly_names:
+                    adapted_keywords[arg] = adapted[arg]
+                return func(*adapted_posargs, **adapted_keywords)
+
+        return wraps(func)(adapting)
+
+    return decorating
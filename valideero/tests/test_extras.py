@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
+import inspect
+import sys
 import unittest
 from decimal import Decimal
 from functools import partial
 
 import valideero as V
 import valideero.extras
-from valideero.compat import long
 from .test_validators import prepare_val_context
 
 
@@ -25,8 +24,8 @@ class TestValidator(unittest.TestCase):
         valid = [
             partial(f, 2.0, field_ids=[]),
             partial(f, Decimal(1), b=5, field_ids=[1], is_ok=True),
-            partial(f, a=3j, b=-1, field_ids=[long(1), 2, long(5)], sex="male"),
-            partial(f, 5 + 3j, 0, field_ids=[long(-12), 0, long(0)], is_ok=False, sex="female"),
+            partial(f, a=3j, b=-1, field_ids=[1, 2, 5], sex="male"),
+            partial(f, 5 + 3j, 0, field_ids=[-12, 0, 0], is_ok=False, sex="female"),
             partial(f, 2.0, field_ids=[], additional="extra param allowed"),
         ]
 
@@ -45,6 +44,20 @@ class TestValidator(unittest.TestCase):
         for fcall in invalid:
             self.assertRaises(V.ValidationError, fcall)
 
+    def test_accepts_binding_errors(self):
+        @valideero.extras.accepts(self.val_context, a="integer", b="integer")
+        def f(a, b=1):
+            return a + b
+
+        self.assertEqual(f.__name__, "f")
+        self.assertEqual(str(inspect.signature(f)), "(a, b=1)")
+        self.assertEqual(f(1), 2)
+        self.assertEqual(f(b=2, a=1), 3)
+        self.assertRaises(TypeError, f)
+        self.assertRaises(TypeError, f, 1, 2, 3)
+        self.assertRaises(TypeError, f, 1, a=2)
+        self.assertRaises(TypeError, f, 1, c=2)
+
     def test_returns(self):
         @valideero.extras.returns(self.val_context, int)
         def f(a):
@@ -73,6 +86,26 @@ class TestValidator(unittest.TestCase):
         for fcall in invalid:
             self.assertRaises(V.ValidationError, fcall)
 
+    def test_stacked_decorators(self):
+        @valideero.extras.accepts(self.val_context, a=int, b=int)
+        @valideero.extras.returns(self.val_context, int)
+        def f(a, b):
+            return a + b
+
+        self.assertEqual(str(inspect.signature(f)), "(a, b)")
+        self.assertEqual(f(1, 2), 3)
+        self.assertEqual(f(1, b=2), 3)
+        self.assertRaises(V.ValidationError, f, 1, 2.0)
+
+        @valideero.extras.adapts(self.val_context, a=V.AdaptTo(int))
+        @valideero.extras.returns(self.val_context, int)
+        def g(a, b=1):
+            return a * b
+
+        self.assertEqual(g("2"), 2)
+        self.assertEqual(g("2", b=3), 6)
+        self.assertRaises(V.ValidationError, g, "2", b=1.5)
+
     def test_adapts(self):
         @valideero.extras.adapts(self.val_context, body={
             "field_ids": ["integer"],
@@ -170,3 +203,31 @@ class TestValidator(unittest.TestCase):
         self.assertEqual(f(2, 2.5, 3, foo=2), 8.0)
         self.assertEqual(f(2, 2.5, 3, bar=3.5), 11.5)
         self.assertEqual(f(2, 2.5, 3, foo=2, bar=3.5), 15.0)
+
+    def test_adapts_kwonly(self):
+        @valideero.extras.adapts(self.val_context, a="integer",
+                                 nums=[V.AdaptTo(int)],
+                                 scale=V.AdaptTo(int))
+        def f(a, *nums, scale=1):
+            return (a + sum(nums)) * scale
+
+        self.assertEqual(f(2), 2)
+        self.assertEqual(f(2, scale="3"), 6)
+        self.assertEqual(f(2, "1", 1.5, scale="3"), 12)
+        self.assertRaises(TypeError, f, 2, foo=1)
+
+    @unittest.skipIf(sys.version_info < (3, 8), "positional-only parameters require Python 3.8")
+    def test_adapts_positional_only(self):
+        namespace = {}
+        # the positional-only syntax doesn't compile on older versions
+        exec("def f(a, /, b=1):\n    return a * b\n"
+             "def g(a, /, **params):\n    return (a, params)\n", namespace)
+        adapts = valideero.extras.adapts(self.val_context, a=V.AdaptTo(int), b="number")
+        f = adapts(namespace["f"])
+        self.assertEqual(f("2"), 2)
+        self.assertEqual(f("2", b=3), 6)
+        self.assertRaises(TypeError, f, a=2)
+
+        g = valideero.extras.adapts(self.val_context, a=V.AdaptTo(int))(namespace["g"])
+        self.assertEqual(g("2"), (2, {}))
+        self.assertEqual(g("2", a=3, c=4), (2, {"a": 3, "c": 4}))
@@ -1,15 +1,17 @@
 # -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
 import collections
+import copy
+import pickle
 import re
+import threading
 import unittest
 from datetime import date, datetime
 from decimal import Decimal
 from functools import partial, wraps
+from itertools import chain
 
 import valideero as V
-from valideero.compat import long, xrange, string_types, int_types, text_type, binary_type
+from valideero.base import _LRUCache
 
 
 class Fraction(V.Type):
@@ -26,6 +28,36 @@ class Gender(V.Enum):
     values = ("male", "female", "it's complicated")
 
 
+_P_DIGITS = re.compile(r"\d{1,4}$")
+_P_ASTAR = re.compile(r"a*$")
+
+# sequences with a maximum range of 10, 10 and 11
+_RANGE_OK_1 = tuple(range(11))
+_RANGE_OK_2 = tuple(range(1000, 1011))
+_RANGE_BAD_1 = tuple(range(12))
+
+# validator instances shared by the tests, parsed once by the shared context
+_BOOL_INST = V.Boolean()
+_INT_INST = V.Integer()
+_NUM_INST = V.Number()
+_STR_INST = V.String()
+_HSEQ_INST = V.HomogeneousSequence()
+_HETSEQ_INST = V.HeterogeneousSequence()
+_MAP_INST = V.Mapping()
+_OBJ_INST = V.Object()
+_FRAC_INST = Fraction()
+_GENDER_INST = Gender()
+
+# schemas that don't accept None
+_NONE_INVALID_SCHEMAS = ("boolean", "integer", "number", "string",
+                         V.HomogeneousSequence, V.HeterogeneousSequence,
+                         V.Mapping, int, float, str,
+                         Fraction, _FRAC_INST, Gender, _GENDER_INST, V.Object, _OBJ_INST)
+
+# objects that can't be parsed as validators
+_BAD_SCHEMAS = (True, 1, 3.2, "foo", object(), ["foo"], {"field": "foo"})
+
+
 def prepare_val_context():
     val_context = V.make_default_validation_context()
     val_context.register(Fraction.name, Fraction())
@@ -34,155 +66,250 @@ def prepare_val_context():
     return val_context
 
 
-class TestValidator(unittest.TestCase):
+_COMPLEX_VALID_CASES = (
+    {'n': 2},
+    {'n': 2.1, 'i': 3},
+    {'n': -1, 'b': False},
+    {'n': Decimal(3), 'e': "r"},
+    {'n': 2, 'd': datetime(2023, 1, 1, 12, 0, 0)},
+    {'n': 0, 'd': date(2023, 1, 1)},
+    {'n': 0, 's': "abc"},
+    {'n': 0, 'p': None},
+    {'n': 0, 'p': "123"},
+    {'n': 0, 'l': []},
+    {'n': 0, 'l': [{"s2": "foo"}, {"s2": ""}]},
+    {'n': 0, 't': (u"joe", 3.1)},
+    {'n': 0, 'h': {5: ["foo", u"bar"], 0: []}},
+    {'n': 0, 'o': {"i2": 3}},
+)
+
+_COMPLEX_INVALID_CASES = (
+    None,
+    {},
+    {'n': None},
+    {'n': True},
+    {'n': 1, 'e': None},
+    {'n': 1, 'e': "a"},
+    {'n': 1, 'd': None},
+    {'n': 1, 's': None},
+    {'n': 1, 's': ''},
+    {'n': 1, 's': '123456789'},
+    {'n': 1, 'p': '123a'},
+    {'n': 1, 'l': None},
+    {'n': 1, 'l': [None]},
+    {'n': 1, 'l': [{}]},
+    {'n': 1, 'l': [{'s2': None}]},
+    {'n': 1, 'l': [{'s2': 1}]},
+    {'n': 1, 't': ()},
+    {'n': 0, 't': (3.1, u"joe")},
+    {'n': 0, 't': (u"joe", None)},
+    {'n': 1, 'h': {5: ["foo", u"bar"], "0": []}},
+    {'n': 1, 'h': {5: ["foo", 2.1], 0: []}},
+    {'n': 1, 'o': {}},
+    {'n': 1, 'o': {"i2": "2"}},
+)
 
-    def setUp(self):
-        self.val_context = prepare_val_context()
 
-        self.complex_validator = self.val_context.parse({
+class TestValidator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # shared by the tests that don't change the context;
+        # the others call _set_object_factory_option or use a fresh context
+        cls._base_val_context = prepare_val_context()
+        cls.complex_validator = cls._base_val_context.parse({
             "n": "number",
             V.Optional("i", 0): "integer",
             V.Optional("b"): bool,
             V.Optional("e"): V.Enum("r", "g", "b"),
             V.Optional("d"): V.AnyOf("date", "datetime"),
             V.Optional("s"): V.String(min_length=1, max_length=8),
-            V.Optional("p"): V.Nullable(re.compile(r"\d{1,4}$")),
+            V.Optional("p"): V.Nullable(_P_DIGITS),
             V.Optional("l"): [{"s2": "string"}],
-            V.Optional("t"): (text_type, "number"),
+            V.Optional("t"): (str, "number"),
             V.Optional("h"): V.Mapping(int, ["string"]),
             V.Optional("o"): {"i2": "integer"},
         })
 
+    def setUp(self):
+        self.val_context = self._base_val_context
+
+    def _set_object_factory_option(self, name, value):
+        """Set an option of the Object factory until the end of the test."""
+        # the contexts discard their cached validators when an option changes
+        factory = self.val_context.validators_factories['Object']
+        self.addCleanup(setattr, factory, name, getattr(factory, name))
+        setattr(factory, name, value)
+
     def test_none(self):
-        for obj in ["boolean", "integer", "number", "string",
-                    V.HomogeneousSequence, V.HeterogeneousSequence,
-                    V.Mapping, int, float, text_type,
-                    Fraction, Fraction(), Gender, Gender(), V.Object, V.Object()]:
-            self.assertFalse(self.val_context.parse(obj).is_valid(None))
+        for obj in _NONE_INVALID_SCHEMAS:
+            with self.subTest(schema=obj):
+                self.assertFalse(self.val_context.parse(obj).is_valid(None))
 
     def test_boolean(self):
-        for obj in "boolean", V.Boolean, V.Boolean():
+        for obj in "boolean", V.Boolean, _BOOL_INST:
             self._testValidation(obj,
-                                 valid=[True, False],
-                                 invalid=[1, 1.1, "foo", u"bar", {}, []])
+                                 valid=(True, False),
+                                 invalid=(1, 1.1, "foo", u"bar", {}, []))
 
     def test_integer(self):
-        for obj in "integer", V.Integer, V.Integer():
+        for obj in "integer", V.Integer, _INT_INST:
             self._testValidation(obj,
-                                 valid=[1],
-                                 invalid=[1.1, "foo", u"bar", {}, [], False, True])
+                                 valid=(1,),
+                                 invalid=(1.1, "foo", u"bar", {}, [], False, True))
 
     def test_int(self):
         # bools are ints
         self._testValidation(int,
-                             valid=[1, True, False],
-                             invalid=[1.1, "foo", u"bar", {}, []])
+                             valid=(1, True, False),
+                             invalid=(1.1, "foo", u"bar", {}, []))
 
     def test_number(self):
-        for obj in "number", V.Number, V.Number():
+        for obj in "number", V.Number, _NUM_INST:
             self._testValidation(obj,
-                                 valid=[1, 1.1],
-                                 invalid=["foo", u"bar", {}, [], False, True])
+                                 valid=(1, 1.1),
+                                 invalid=("foo", u"bar", {}, [], False, True))
 
     def test_float(self):
         self._testValidation(float,
-                             valid=[1.1],
-                             invalid=[1, "foo", u"bar", {}, [], False, True])
+                             valid=(1.1,),
+                             invalid=(1, "foo", u"bar", {}, [], False, True))
 
     def test_string(self):
-        for obj in "string", V.String, V.String():
+        for obj in "string", V.String, _STR_INST:
             self._testValidation(obj,
-                                 valid=["foo", u"bar"],
-                                 invalid=[1, 1.1, {}, [], False, True])
+                                 valid=("foo", u"bar"),
+                                 invalid=(1, 1.1, {}, [], False, True))
 
     def test_string_min_length(self):
         self._testValidation(V.String(min_length=2),
-                             valid=["foo", u"fo"],
-                             invalid=[u"f", "", False])
+                             valid=("foo", u"fo"),
+                             invalid=(u"f", "", False))
 
     def test_string_max_length(self):
         self._testValidation(V.String(max_length=2),
-                             valid=["", "f", u"fo"],
-                             invalid=[u"foo", [1, 2, 3]])
+                             valid=("", "f", u"fo"),
+                             invalid=(u"foo", [1, 2, 3]))
 
     def test_pattern(self):
-        self._testValidation(re.compile(r"a*$"),
-                             valid=["aaa"],
-                             invalid=[u"aba", "baa"])
+        self._testValidation(_P_ASTAR,
+                             valid=("aaa",),
+                             invalid=(u"aba", "baa"))
 
     def test_range(self):
         self._testValidation(V.Range("integer", 1),
-                             valid=[1, 2, 3],
-                             invalid=[0, -1])
+                             valid=(1, 2, 3),
+                             invalid=(0, -1))
         self._testValidation(V.Range("integer", max_value=2),
-                             valid=[-1, 0, 1, 2],
-                             invalid=[3])
+                             valid=(-1, 0, 1, 2),
+                             invalid=(3,))
         self._testValidation(V.Range("integer", 1, 2),
-                             valid=[1, 2],
-                             invalid=[-1, 0, 3])
+                             valid=(1, 2),
+                             invalid=(-1, 0, 3))
         self._testValidation(V.Range(min_value=1, max_value=2),
-                             valid=[1, 2],
-                             invalid=[-1, 0, 3])
+                             valid=(1, 2),
+                             invalid=(-1, 0, 3))
 
     def test_homogeneous_sequence(self):
-        for obj in V.HomogeneousSequence, V.HomogeneousSequence():
+        for obj in V.HomogeneousSequence, _HSEQ_INST:
             self._testValidation(obj,
-                                 valid=[[], [1], (1, 2), [1, (2, 3), 4]],
-                                 invalid=[1, 1.1, "foo", u"bar", {}, False, True])
+                                 valid=([], [1], (1, 2), [1, (2, 3), 4]),
+                                 invalid=(1, 1.1, "foo", u"bar", {}, False, True))
         self._testValidation(["number"],
-                             valid=[[], [1, 2.1, long(3)], (1, long(4), 6)],
-                             invalid=[[1, 2.1, long(3), u"x"]])
+                             valid=([], [1, 2.1, 3], (1, 4, 6)),
+                             invalid=([1, 2.1, 3, u"x"],))
+        self._testValidation(["integer"],
+                             valid=(list(range(100)), (1, 2)),
+                             invalid=([1, True], [1, 2.0]),
+                             errors=(([1, 2, "3", 4, 5.0], "Invalid value '3' (str): must be integer (at value[2])"),))
 
     def test_heterogeneous_sequence(self):
-        for obj in V.HeterogeneousSequence, V.HeterogeneousSequence():
+        for obj in V.HeterogeneousSequence, _HETSEQ_INST:
             self._testValidation(obj,
-                                 valid=[(), []],
-                                 invalid=[1, 1.1, "foo", u"bar", {}, False, True])
+                                 valid=((), []),
+                                 invalid=(1, 1.1, "foo", u"bar", {}, False, True))
         self._testValidation(("string", "number"),
-                             valid=[("a", 2), [u"b", 4.1]],
-                             invalid=[[], (), (2, "a"), ("a", "b"), (1, 2)])
+                             valid=(("a", 2), [u"b", 4.1]),
+                             invalid=([], (), (2, "a"), ("a", "b"), (1, 2)),
+                             errors=((("a", "b"), "Invalid value 'b' (str): must be number (at value[1])"),
+                                     (["a"], "Invalid value ['a'] (list): 2 items expected, 1 found")))
+        # long sequences are validated in a loop instead of generated code
+        long_schema = ("integer",) * (V.HeterogeneousSequence.max_unrolled_items + 1)
+        self.assertIsNone(self.val_context.emit(long_schema))
+        self._testValidation(long_schema,
+                             valid=(tuple(range(len(long_schema))),),
+                             invalid=(tuple(range(len(long_schema) - 1)), ("x",) * len(long_schema)))
 
     def test_sequence_min_length(self):
         self._testValidation(V.HomogeneousSequence(int, min_length=2),
-                             valid=[[1, 2, 4], (1, 2)],
-                             invalid=[[1], [], (), "123", "", False])
+                             valid=([1, 2, 4], (1, 2)),
+                             invalid=([1], [], (), "123", "", False))
 
     def test_sequence_max_length(self):
         self._testValidation(V.HomogeneousSequence(int, max_length=2),
-                             valid=[[], (), (1,), (1, 2), [1, 2]],
-                             invalid=[[1, 2, 3], "123", "f"])
+                             valid=([], (), (1,), (1, 2), [1, 2]),
+                             invalid=([1, 2, 3], "123", "f"))
 
     def test_mapping(self):
-        for obj in V.Mapping, V.Mapping():
+        for obj in V.Mapping, _MAP_INST:
             self._testValidation(obj,
-                                 valid=[{}, {"foo": 3}],
-                                 invalid=[1, 1.1, "foo", u"bar", [], False, True])
+                                 valid=({}, {"foo": 3}),
+                                 invalid=(1, 1.1, "foo", u"bar", [], False, True))
         self._testValidation(V.Mapping("string", "number"),
-                             valid=[{"foo": 3},
-                                    {"foo": 3, u"bar": -2.1, "baz": Decimal("12.3")}],
-                             invalid=[{"foo": 3, ("bar",): -2.1},
-                                      {"foo": 3, "bar": "2.1"}])
+                             valid=({"foo": 3},
+                                    {"foo": 3, u"bar": -2.1, "baz": Decimal("12.3")}),
+                             invalid=({"foo": 3, ("bar",): -2.1},
+                                      {"foo": 3, "bar": "2.1"}),
+                             errors=(({"foo": 3, "bar": "2.1"},
+                                      "Invalid value '2.1' (str): must be number (at bar)"),))
+        self._testValidation(V.Mapping(V.AdaptTo(int)),
+                             valid=({}, collections.OrderedDict([(2, None)])),
+                             adapted=(({"1": "a"}, {1: "a"}),
+                                      (collections.OrderedDict([("2", 1), ("1", 2)]),
+                                       collections.OrderedDict([(2, 1), (1, 2)]))),
+                             invalid=({"x": 1},))
+
+    def test_iter_validated_items_override(self):
+        # the subclasses that override the former items hook are validated with it
+        class Doubled(V.HomogeneousSequence):
+            def _iter_validated_items(self, value):
+                for item in super(Doubled, self)._iter_validated_items(value):
+                    yield item * 2
+
+        class Upper(V.Mapping):
+            def _iter_validated_items(self, value):
+                for k, v in super(Upper, self)._iter_validated_items(value):
+                    yield k.upper(), v
+
+        for schema, value, adapted in ((Doubled("integer"), [1, 2], [2, 4]),
+                                       (Doubled("integer"), (1, 2), (2, 4)),
+                                       (Upper("string", "integer"), {"a": 1}, {"A": 1})):
+            validator = self.val_context.parse(schema)
+            self.assertIsNone(validator.emit())
+            self._testValidation(validator, adapted=((value, adapted),))
+            self.assertEqual(validator.compile()(value), adapted)
+        self._testValidation(Doubled("integer"), errors=(([1, "2"], "Invalid value '2' (str): must be integer (at value[1])"),))
 
     def test_object(self):
-        for obj in V.Object, V.Object():
+        for obj in V.Object, _OBJ_INST:
             self._testValidation(obj,
-                                 valid=[{}, {"foo": 3}],
-                                 invalid=[1, 1.1, "foo", u"bar", [], False, True])
+                                 valid=({}, {"foo": 3}),
+                                 invalid=(1, 1.1, "foo", u"bar", [], False, True))
         self._testValidation({"foo": "number", "bar": "string"},
-                             valid=[{"foo": 1, "bar": "baz"},
-                                    {"foo": 1, "bar": "baz", "quux": 42}],
-                             invalid=[{"foo": 1, "bar": []},
-                                      {"foo": "baz", "bar": 2.3}])
+                             valid=({"foo": 1, "bar": "baz"},
+                                    {"foo": 1, "bar": "baz", "quux": 42}),
+                             invalid=({"foo": 1, "bar": []},
+                                      {"foo": "baz", "bar": 2.3}))
 
     def test_required_properties_global(self):
         self._testValidation({"foo": "number", V.Optional("bar"): "boolean", "baz": "string"},
-                             valid=[{"foo": -23., "baz": "yo"}],
-                             invalid=[{},
+                             valid=({"foo": -23., "baz": "yo"},),
+                             invalid=({},
                                       {"bar": True},
                                       {"baz": "yo"},
                                       {"foo": 3},
                                       {"bar": False, "baz": "yo"},
-                                      {"bar": True, "foo": 3.1}])
+                                      {"bar": True, "foo": 3.1}))
 
     def test_required_properties_parse_parameter(self):
         schema = {
@@ -193,8 +320,9 @@ class TestValidator(unittest.TestCase):
             }]
         }
         missing_properties = [{}, {"bar": True}, {"foo": 3, "nested": [{}]}]
-        for _ in xrange(3):
-            self._testValidation(self.val_context.parse(schema), invalid=missing_properties)
+        validator = self.val_context.parse(schema)
+        self.assertIs(self.val_context.parse(schema), validator)
+        self._testValidation(validator, invalid=missing_properties)
 
     def test_ignore_optional_property_errors_parse_parameter(self):
         schema = {
@@ -218,44 +346,87 @@ class TestValidator(unittest.TestCase):
             {"foo": 3.1, "nested": [{"baz": "x"}]},
             {"foo": 0},
         ]
-        for _ in xrange(3):
-            self.val_context.validators_factories['Object'].ignore_optional_property_errors = False
-            self._testValidation(self.val_context.parse(schema), invalid=invalid_required + invalid_optional)
-            self.val_context.validators_factories['Object'].ignore_optional_property_errors = True
-            self._testValidation(self.val_context.parse(schema), invalid=invalid_required,
-                                 adapted=zip(invalid_optional, adapted))
+        adapted_pairs = tuple(zip(invalid_optional, adapted))
+        self._set_object_factory_option("ignore_optional_property_errors", False)
+        validator = self.val_context.parse(schema)
+        self.assertIs(self.val_context.parse(schema), validator)
+        self._testValidation(validator, invalid=invalid_required + invalid_optional)
+        self._set_object_factory_option("ignore_optional_property_errors", True)
+        self._testValidation(self.val_context.parse(schema), invalid=invalid_required,
+                             adapted=adapted_pairs)
+
+    def test_object_properties_validated_in_order(self):
+        # the first invalid property in declaration order is reported
+        for schema in ({V.Optional("a"): "integer", "b": "integer"},
+                       {V.Optional("a", 0): "integer", "b": "integer"}):
+            validator = self.val_context.parse(schema)
+            for validate in validator.validate, validator.compile():
+                with self.assertRaises(V.ValidationError) as cm:
+                    validate({"a": "x", "b": "y"})
+                self.assertEqual(cm.exception.error_path_items, ["a"])
+
+    def test_object_not_copied_if_not_adapted(self):
+        for schema in ({"foo": "number", V.Optional("bar"): V.Range("integer", 1)},
+                       V.Object({"foo": {"bar": V.Enum(1, 2)}})):
+            validator = self.val_context.parse(schema)
+            self.assertTrue(validator.is_pure)
+            value = {"foo": {"bar": 1}} if isinstance(schema, V.Object) else {"foo": 1, "bar": 2}
+            self.assertIs(validator.validate(value), value)
+            self.assertIs(V.Object.validate(validator, value), value)
+
+        for schema in ({"foo": "number", V.Optional("bar", 1): "integer"},
+                       {"foo": V.AdaptTo(int)},
+                       V.Object({"foo": "number"}, additional=V.REMOVE)):
+            validator = self.val_context.parse(schema)
+            self.assertFalse(validator.is_pure)
+            value = {"foo": 1}
+            self.assertIsNot(validator.validate(value), value)
+            self.assertEqual(validator.validate(value), V.Object.validate(validator, value))
+
+        class Adapting(V.Type):
+            def validate(self, value):
+                return str(value)
+
+        self.assertFalse(Adapting().is_pure)
+        self.assertEqual(self.val_context.parse({"foo": Adapting()}).validate({"foo": 1}), {"foo": "1"})
 
     def test_adapt_missing_property(self):
         self._testValidation({"foo": "number", V.Optional("bar", False): "boolean"},
-                             adapted=[({"foo": -12}, {"foo": -12, "bar": False})])
+                             adapted=(({"foo": -12}, {"foo": -12, "bar": False}),))
 
     def test_no_additional_properties(self):
         self._testValidation(V.Object({"foo": "number",
                                        V.Optional("bar"): "string"},
                                       additional=False),
-                             valid=[{"foo": 23},
-                                    {"foo": -23., "bar": "yo"}],
-                             invalid=[{"foo": 23, "xyz": 1},
-                                      {"foo": -23., "bar": "yo", "xyz": 1}]
+                             valid=({"foo": 23},
+                                    {"foo": -23., "bar": "yo"}),
+                             invalid=({"foo": 23, "xyz": 1},
+                                      {"foo": -23., "bar": "yo", "xyz": 1})
                              )
 
     def test_remove_additional_properties(self):
         self._testValidation(V.Object({"foo": "number",
                                        V.Optional("bar"): "string"},
                                       additional=V.REMOVE),
-                             adapted=[({"foo": 23}, {"foo": 23}),
+                             adapted=(({"foo": 23}, {"foo": 23}),
                                       ({"foo": -23., "bar": "yo"}, {"foo": -23., "bar": "yo"}),
                                       ({"foo": 23, "xyz": 1}, {"foo": 23}),
-                                      ({"foo": -23., "bar": "yo", "xyz": 1}, {"foo": -23., "bar": "yo"})]
+                                      ({"foo": -23., "bar": "yo", "xyz": 1}, {"foo": -23., "bar": "yo"}),
+                                      (collections.OrderedDict([("xyz", 1), ("foo", 23)]),
+                                       collections.OrderedDict([("foo", 23)])))
                              )
+        # the generated code removes the properties like Object.validate
+        validator = self.val_context.parse(V.Object({"foo": "number"}, additional=V.REMOVE))
+        for value in {"xyz": 1, "foo": 23}, collections.OrderedDict([("xyz", 1), ("foo", 23)]):
+            self.assertEqual(V.Object.validate(validator, value), validator.validate(value))
 
     def test_additional_properties_schema(self):
         self._testValidation(V.Object({"foo": "number",
                                        V.Optional("bar"): "string"},
                                       additional="boolean"),
-                             valid=[{"foo": 23, "bar": "yo", "x1": True, "x2": False}],
-                             invalid=[{"foo": 23, "x1": 1},
-                                      {"foo": -23., "bar": "yo", "x1": True, "x2": 0}]
+                             valid=({"foo": 23, "bar": "yo", "x1": True, "x2": False},),
+                             invalid=({"foo": 23, "x1": 1},
+                                      {"foo": -23., "bar": "yo", "x1": True, "x2": 0})
                              )
 
     def test_additional_properties_parse_parameter(self):
@@ -267,54 +438,65 @@ class TestValidator(unittest.TestCase):
         }
         values = [{"x1": "yes"},
                   {"bar": True, "nested": [{"x1": "yes"}]}]
-        for _ in xrange(3):
-            self.val_context.validators_factories['Object'].additional_properties = True
-            self._testValidation(schema,
-                                 valid=values)
-            self.val_context.validators_factories['Object'].additional_properties = False
-            self._testValidation(schema,
-                                 invalid=values)
-            self.val_context.validators_factories['Object'].additional_properties = V.REMOVE
-            self._testValidation(schema,
-                                 adapted=[(values[0], {}), (values[1], {"bar": True, "nested": [{}]})])
-            self.val_context.validators_factories['Object'].additional_properties = "string"
-            self._testValidation(schema,
-                                 valid=values, invalid=[{"x1": 42}, {"bar": True, "nested": [{"x1": 42}]}])
+        self._set_object_factory_option("additional_properties", True)
+        self.assertIs(self.val_context.parse(schema), self.val_context.parse(schema))
+        self._testValidation(schema,
+                             valid=values)
+        self._set_object_factory_option("additional_properties", False)
+        self._testValidation(schema,
+                             invalid=values)
+        self._set_object_factory_option("additional_properties", V.REMOVE)
+        self._testValidation(schema,
+                             adapted=((values[0], {}), (values[1], {"bar": True, "nested": [{}]})))
+        self._set_object_factory_option("additional_properties", "string")
+        self._testValidation(schema,
+                             valid=values, invalid=({"x1": 42}, {"bar": True, "nested": [{"x1": 42}]}))
 
     def test_enum(self):
         self._testValidation(V.Enum(1, 2, 3),
-                             valid=[1, 2, 3], invalid=[0, 4, "1", [1]])
+                             valid=(1, 2, 3), invalid=(0, 4, "1", [1]))
         self._testValidation(V.Enum(u"foo", u"bar"),
-                             valid=["foo", "bar"], invalid=["", "fooabar", ["foo"]])
+                             valid=("foo", "bar"), invalid=("", "fooabar", ["foo"]))
         self._testValidation(V.Enum(True),
-                             valid=[True], invalid=[False, [True]])
+                             valid=(True,), invalid=(False, [True]))
         self._testValidation(V.Enum({"foo": u"bar"}),
-                             valid=[{u"foo": "bar"}])
+                             valid=({u"foo": "bar"},))
         self._testValidation(V.Enum({"foo": u"quux"}),
-                             invalid=[{u"foo": u"bar"}])
+                             invalid=({u"foo": u"bar"},))
+
+        validator = V.Enum(1, 2)
+        compiled = validator.compile()
+        validator.values = {3}
+        self._testValidation(validator, valid=(3,), invalid=(1, 2))
+        self.assertEqual(compiled(3), 3)
+        self.assertRaises(V.ValidationError, compiled, 1)
 
     def test_enum_class(self):
-        for obj in "gender", Gender, Gender():
+        for obj in "gender", Gender, _GENDER_INST:
             self._testValidation(obj,
-                                 valid=["male", "female", "it's complicated"],
-                                 invalid=["other", ""])
+                                 valid=("male", "female", "it's complicated"),
+                                 invalid=("other", ""))
 
     def test_nullable(self):
         for obj in V.Nullable("integer"), V.Nullable(V.Integer()):
             self._testValidation(obj,
-                                 valid=[None, 0],
-                                 invalid=[1.1, True, False])
+                                 valid=(None, 0),
+                                 invalid=(1.1, True, False))
         self._testValidation(V.Nullable([V.Nullable("string")]),
-                             valid=[None, [], ["foo"], [None], ["foo", None]],
-                             invalid=["", [None, "foo", 1]])
+                             valid=(None, [], ["foo"], [None], ["foo", None]),
+                             invalid=("", [None, "foo", 1]))
+        # the nullable alternatives extend a copy of a shared AnyOf
+        any_of = V.AnyOf("integer", "string")
+        self._testValidation(V.Nullable(any_of), valid=(None, 1, "a"), invalid=(1.1,))
+        self._testValidation(any_of, valid=(1, "a"), invalid=(None,))
 
     def test_nullable_with_default(self):
         self._testValidation(V.Nullable("integer", -1),
-                             adapted=[(None, -1), (0, 0)],
-                             invalid=[1.1, True, False])
+                             adapted=((None, -1), (0, 0)),
+                             invalid=(1.1, True, False))
         self._testValidation(V.Nullable("integer", lambda: -1),
-                             adapted=[(None, -1), (0, 0)],
-                             invalid=[1.1, True, False])
+                             adapted=((None, -1), (0, 0)),
+                             invalid=(1.1, True, False))
 
     def test_optional_properties_with_default(self):
 
@@ -326,7 +508,7 @@ class TestValidator(unittest.TestCase):
             V.Nullable("integer", default=lambda: None)
         ]
         for obj in regular_nullables:
-            self._testValidation({V.Optional("foo"): obj}, adapted=[({}, {})])
+            self._testValidation({V.Optional("foo"): obj}, adapted=(({}, {}),))
 
         optionals = [
             V.Optional("foo", None),
@@ -335,33 +517,58 @@ class TestValidator(unittest.TestCase):
             V.Optional("foo", default=lambda: None)
         ]
         for property in optionals:
-            self._testValidation({property: V.Nullable("integer")}, adapted=[({}, {"foo": None})])
+            self._testValidation({property: V.Nullable("integer")}, adapted=(({}, {"foo": None}),))
 
     def test_anyof(self):
         self._testValidation(V.AnyOf("integer", {"foo": "integer"}),
-                             valid=[1, {"foo": 1}],
-                             invalid=[{"foo": 1.1}])
+                             valid=(1, {"foo": 1}),
+                             invalid=({"foo": 1.1},))
+
+    def test_anyof_adapts_once(self):
+        calls = []
+
+        def adapt(value):
+            calls.append(value)
+            raise ValueError(value)
+
+        validator = self.val_context.parse(V.AnyOf("integer", V.AdaptBy(adapt)))
+        with self.assertRaises(V.ValidationError) as cm:
+            validator.validate("x")
+        self.assertEqual(calls, ["x"])
+        self.assertIn("integer", cm.exception.msg)
+
+        def predicate(value):
+            calls.append(value)
+            return False
+
+        # pure validators without a fast is_valid are validated once as well
+        for schema, value in ((V.AnyOf(predicate, "integer"), "x"),
+                              (V.AnyOf({"a": predicate}, "integer"), {"a": "x"})):
+            del calls[:]
+            with self.assertRaises(V.ValidationError):
+                self.val_context.parse(schema).validate(value)
+            self.assertEqual(calls, ["x"])
 
     def test_allof(self):
         self._testValidation(V.AllOf({"id": "integer"}, V.Mapping("string", "number")),
-                             valid=[{"id": 3}, {"id": 3, "bar": 4.5}],
-                             invalid=[{"id": 1.1, "bar": 4.5},
+                             valid=({"id": 3}, {"id": 3, "bar": 4.5}),
+                             invalid=({"id": 1.1, "bar": 4.5},
                                       {"id": 3, "bar": True},
-                                      {"id": 3, 12: 4.5}])
+                                      {"id": 3, 12: 4.5}))
 
         self._testValidation(V.AllOf("number",
                                      lambda x: x > 0,
                                      V.AdaptBy(datetime.utcfromtimestamp)),
-                             adapted=[(1373475820, datetime(2013, 7, 10, 17, 3, 40))],
-                             invalid=["1373475820", -1373475820])
+                             adapted=((1373475820, datetime(2013, 7, 10, 17, 3, 40)),),
+                             invalid=("1373475820", -1373475820))
 
     def test_chainof(self):
         self._testValidation(V.ChainOf(V.AdaptTo(int),
                                        V.Condition(lambda x: x > 0),
                                        V.AdaptBy(datetime.utcfromtimestamp)),
-                             adapted=[(1373475820, datetime(2013, 7, 10, 17, 3, 40)),
-                                      ("1373475820", datetime(2013, 7, 10, 17, 3, 40))],
-                             invalid=["nan", -1373475820])
+                             adapted=((1373475820, datetime(2013, 7, 10, 17, 3, 40)),
+                                      ("1373475820", datetime(2013, 7, 10, 17, 3, 40))),
+                             invalid=("nan", -1373475820))
 
     def test_condition(self):
         def is_odd(n):
@@ -381,17 +588,17 @@ class TestValidator(unittest.TestCase):
 
         for obj in is_odd, C().is_odd_method, C.is_odd_static:
             self._testValidation(obj,
-                                 valid=[1, long(3), -11, 9.0, True],
-                                 invalid=[6, 2.1, False, "1", []])
+                                 valid=(1, 3, -11, 9.0, True),
+                                 invalid=(6, 2.1, False, "1", []))
 
         for obj in is_even, C().is_even_method, C.is_even_static:
             self._testValidation(obj,
-                                 valid=[6, long(2), -42, 4.0, 0, 0.0, False],
-                                 invalid=[1, 2.1, True, "2", []])
+                                 valid=(6, 2, -42, 4.0, 0, 0.0, False),
+                                 invalid=(1, 2.1, True, "2", []))
 
-        self._testValidation(text_type.isalnum,
-                             valid=["abc", "123", "ab32c"],
-                             invalid=["a+b", "a 1", "", True, 2])
+        self._testValidation(str.isalnum,
+                             valid=("abc", "123", "ab32c"),
+                             invalid=("a+b", "a 1", "", True, 2))
 
         self.assertRaises(TypeError, V.Condition, C)
         self.assertRaises(TypeError, V.Condition(is_even, traps=()).validate, [2, 4])
@@ -404,40 +611,40 @@ class TestValidator(unittest.TestCase):
 
         for obj in f, V.Condition(f):
             self._testValidation(obj,
-                                 valid=[xrange(11), xrange(1000, 1011)],
-                                 invalid=[xrange(12), [0, 1, 2, 3, 4, 11]])
+                                 valid=(_RANGE_OK_1, _RANGE_OK_2),
+                                 invalid=(_RANGE_BAD_1, [0, 1, 2, 3, 4, 11]))
 
     def test_adapt_ordered_dict_object(self):
         self._testValidation(
             {"foo": V.AdaptTo(int), "bar": V.AdaptTo(float)},
-            adapted=[(
+            adapted=((
                 collections.OrderedDict([("foo", "1"), ("bar", "2")]),
                 collections.OrderedDict([("foo", 1), ("bar", 2.0)])
-            )])
+            ),))
 
     def test_adapt_ordered_dict_mapping(self):
         self._testValidation(
             V.Mapping("string", V.AdaptTo(float)),
-            adapted=[(
+            adapted=((
                 collections.OrderedDict([("foo", "1"), ("bar", "2")]),
                 collections.OrderedDict([("foo", 1.0), ("bar", 2.0)])
-            )])
+            ),))
 
     def test_adapt_by(self):
-        self._testValidation(V.AdaptBy(lambda x: text_type(hex(x)), traps=TypeError),
-                             invalid=[1.2, "1"],
-                             adapted=[(255, "0xff"), (0, "0x0")])
+        self._testValidation(V.AdaptBy(lambda x: str(hex(x)), traps=TypeError),
+                             invalid=(1.2, "1"),
+                             adapted=((255, "0xff"), (0, "0x0")))
         self._testValidation(V.AdaptBy(int, traps=(ValueError, TypeError)),
-                             invalid=["12b", "1.2", {}, (), []],
-                             adapted=[(12, 12), ("12", 12), (1.2, 1)])
+                             invalid=("12b", "1.2", {}, (), []),
+                             adapted=((12, 12), ("12", 12), (1.2, 1)))
         self.assertRaises(TypeError, V.AdaptBy(hex, traps=()).validate, 1.2)
 
     def test_adapt_to(self):
         self.assertRaises(TypeError, V.AdaptTo, hex)
         for exact in False, True:
             self._testValidation(V.AdaptTo(int, traps=(ValueError, TypeError), exact=exact),
-                                 invalid=["12b", "1.2", {}, (), []],
-                                 adapted=[(12, 12), ("12", 12), (1.2, 1)])
+                                 invalid=("12b", "1.2", {}, (), []),
+                                 adapted=((12, 12), ("12", 12), (1.2, 1)))
 
         class smallint(int):
             pass
@@ -447,10 +654,10 @@ class TestValidator(unittest.TestCase):
         self.assertIsNot(V.AdaptTo(int, exact=True).validate(i), i)
 
     def test_fraction(self):
-        for obj in "fraction", Fraction, Fraction():
+        for obj in "fraction", Fraction, _FRAC_INST:
             self._testValidation(obj,
-                                 valid=[1.1, 0j, 5 + 3j, Decimal(1) / Decimal(8)],
-                                 invalid=[1, "foo", u"bar", {}, [], False, True])
+                                 valid=(1.1, 0j, 5 + 3j, Decimal(1) / Decimal(8)),
+                                 invalid=(1, "foo", u"bar", {}, [], False, True))
 
     def test_reject_types(self):
         schema = V.Type(accept_types=Exception, reject_types=Warning)
@@ -459,16 +666,9 @@ class TestValidator(unittest.TestCase):
         self.assertRaises(V.ValidationError, exception_validator.validate, UserWarning())
 
     def test_schema_errors(self):
-        for obj in [
-            True,
-            1,
-            3.2,
-            "foo",
-            object(),
-            ["foo"],
-            {"field": "foo"},
-        ]:
-            self.assertRaises(V.SchemaError, self.val_context.parse, obj)
+        for obj in _BAD_SCHEMAS:
+            with self.subTest(schema=obj):
+                self.assertRaises(V.SchemaError, self.val_context.parse, obj)
 
     def test_not_implemented_validation(self):
         class MyValidator(V.Validator):
@@ -478,106 +678,287 @@ class TestValidator(unittest.TestCase):
         self.assertRaises(NotImplementedError, validator.validate, 1)
 
     def test_register(self):
+        self.val_context = prepare_val_context()
         for register in (self.val_context.register,):
             register("to_int", V.AdaptTo(int, traps=(ValueError, TypeError)))
             self._testValidation("to_int",
-                                 invalid=["12b", "1.2"],
-                                 adapted=[(12, 12), ("12", 12), (1.2, 1)])
+                                 invalid=("12b", "1.2"),
+                                 adapted=((12, 12), ("12", 12), (1.2, 1)))
 
             self.assertRaises(TypeError, register, "to_int", int)
 
+    def test_register_factory(self):
+        self.val_context = prepare_val_context()
+        calls = []
+
+        def complex_factory(obj):
+            calls.append(obj)
+            return V.Enum(obj)
+
+        complex_factory.schema_types = (complex,)
+        self.assertRaises(V.SchemaError, self.val_context.parse, 1j)
+        # registering a factory discards the factories that were looked up for
+        # complex numbers
+        self.val_context.register_factory("Complex", complex_factory)
+        self.assertIs(self.val_context.validators_factories["Complex"], complex_factory)
+        self._testValidation(1j, valid=(1j,), invalid=(2j, 1))
+        self.assertEqual(calls, [1j])
+        self.assertRaises(V.SchemaError, self.val_context.parse, 1.5)
+        self.assertEqual(calls, [1j])
+
+        # and so does changing the factories mapping
+        del self.val_context.validators_factories["Complex"]
+        self.assertNotIn("Complex", self.val_context.validators_factories)
+        self.assertRaises(V.SchemaError, self.val_context.parse, 2j)
+        self.val_context.validators_factories["Complex"] = complex_factory
+        self._testValidation(2j, valid=(2j,))
+
+    def test_is_valid(self):
+        for schema, valid, invalid in [("integer", 1, True),
+                                       (V.String(max_length=1), "a", "ab"),
+                                       (V.String(min_length=2), "ab", 12),
+                                       (V.Pattern("a+"), "aa", "b"),
+                                       (V.Pattern("a+"), "a", b"a"),
+                                       (V.Enum(1, 2), 2, [1]),
+                                       (V.NoneValue(), None, 0),
+                                       (V.Nullable(V.String(max_length=1)), None, "ab"),
+                                       (V.AnyOf("integer", V.AdaptTo(int)), "1", "x"),
+                                       (V.Range("integer", 1, 3), 2, 4),
+                                       (V.Condition(lambda x: x > 0), 1, 0),
+                                       (Gender, "male", "other"),
+                                       (V.AdaptTo(int), "1", "x"),
+                                       (["integer"], [1, 2], [1, "2"]),
+                                       (("integer", "string"), (1, "a"), (1, 2)),
+                                       (V.Mapping("string", "integer"), {"a": 1}, {"a": "1"}),
+                                       ({"foo": "integer", V.Optional("bar"): "string"},
+                                        {"foo": 1}, {"foo": 1, "bar": 2}),
+                                       (self.complex_validator, _COMPLEX_VALID_CASES[0],
+                                        _COMPLEX_INVALID_CASES[0])]:
+            # _testValidation only calls validate, so is_valid is checked against it here
+            validator = self.val_context.parse(schema)
+            self.assertTrue(validator.is_valid(valid))
+            validator.validate(valid)
+            self.assertFalse(validator.is_valid(invalid))
+            self.assertRaises(V.ValidationError, validator.validate, invalid)
+        self.assertEqual(self.val_context.parse(V.AnyOf("integer", V.AdaptTo(int))).validate("1"), 1)
+
+    def test_validate_many(self):
+        validator = self.val_context.parse({"foo": V.AdaptTo(int), V.Optional("bar", 0): "integer"})
+        self.assertEqual(validator.validate_many([{"foo": "1"}, {"foo": 2, "bar": 3}]),
+                         [{"foo": 1, "bar": 0}, {"foo": 2, "bar": 3}])
+        self.assertEqual(validator.validate_many(iter([])), [])
+        with self.assertRaises(V.ValidationError) as cm:
+            validator.validate_many([{"foo": 1}, {"foo": 1, "bar": "x"}])
+        self.assertEqual(cm.exception.to_text(), "Invalid value 'x' (str): must be integer (at value[1]['bar'])")
+        # the compiled function is cached by the context and looked up again
+        validator.compile = lambda: self.fail("compiled again")
+        self.assertEqual(validator.validate_many([{"foo": 2}]), [{"foo": 2, "bar": 0}])
+        # a validator that wasn't parsed by a context
+        self.assertEqual(V.Type(int).validate_many([1, 2]), [1, 2])
+
+    def test_parse_cache(self):
+        schema = {"foo": "integer"}
+        validator = self.val_context.parse(schema)
+        self.assertIs(self.val_context.parse(schema), validator)
+        self.assertIsNot(self.val_context.parse({"foo": "integer"}), validator)
+        self.assertIs(self.val_context.parse(int), self.val_context.parse(int))
+        # leaf validators are shared within a context only, as they use its type names
+        json_context = V.make_json_validation_context()
+        self.assertIsNot(json_context.parse(int), self.val_context.parse(int))
+        self.assertEqual(json_context.parse(int).humanized_name, "integer")
+
+        # changing a factory option discards the cached validators
+        self.assertTrue(self.val_context.parse(schema).is_valid({"foo": 1, "bar": 2}))
+        self._set_object_factory_option("additional_properties", False)
+        self.assertFalse(self.val_context.parse(schema).is_valid({"foo": 1, "bar": 2}))
+        self.assertRaises(V.ValidationError, self.val_context.compile(schema), {"foo": 1, "bar": 2})
+
+    def test_parse_cache_threads(self):
+        cache = _LRUCache(8)
+        errors = []
+
+        def use_cache(offset):
+            try:
+                for i in range(2000):
+                    key = (i + offset) % 12
+                    if cache.get(key) is None:
+                        cache.set(key, key)
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=use_cache, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache._items), 8)
+
+    def test_pickle_and_copy(self):
+        for validator, valid, invalid in [(self.val_context.parse({"a": int}), {"a": 1}, {"a": "1"}),
+                                          (self.val_context.parse([int]), [1, 2], [1, "2"]),
+                                          (self.val_context.parse(V.Pattern("a+")), "aa", "b"),
+                                          (self.complex_validator, _COMPLEX_VALID_CASES[-1], {})]:
+            validator.compile()
+            for copied in pickle.loads(pickle.dumps(validator)), copy.deepcopy(validator):
+                self.assertEqual(copied.validate(valid), validator.validate(valid))
+                self.assertFalse(copied.is_valid(invalid))
+
+        # the validators read their attributes when validating
+        validator = self.val_context.parse(V.Type(int))
+        copied = copy.deepcopy(validator)
+        copied.accept_types = str
+        self.assertEqual(copied.validate("a"), "a")
+        self.assertTrue(copied.is_valid("a"))
+        self.assertFalse(validator.is_valid("a"))
+        validator = self.val_context.parse(V.Pattern("a+"))
+        validator.regexp = re.compile("b+")
+        self.assertEqual(validator.validate("b"), "b")
+        self.assertEqual(validator.compile()("b"), "b")
+
     def test_complex_validation(self):
 
-        for valid in [
-            {'n': 2},
-            {'n': 2.1, 'i': 3},
-            {'n': -1, 'b': False},
-            {'n': Decimal(3), 'e': "r"},
-            {'n': long(2), 'd': datetime.now()},
-            {'n': 0, 'd': date.today()},
-            {'n': 0, 's': "abc"},
-            {'n': 0, 'p': None},
-            {'n': 0, 'p': "123"},
-            {'n': 0, 'l': []},
-            {'n': 0, 'l': [{"s2": "foo"}, {"s2": ""}]},
-            {'n': 0, 't': (u"joe", 3.1)},
-            {'n': 0, 'h': {5: ["foo", u"bar"], 0: []}},
-            {'n': 0, 'o': {"i2": 3}},
-        ]:
+        for valid in _COMPLEX_VALID_CASES:
             self.complex_validator.validate(valid)
 
-        for invalid in [
-            None,
-            {},
-            {'n': None},
-            {'n': True},
-            {'n': 1, 'e': None},
-            {'n': 1, 'e': "a"},
-            {'n': 1, 'd': None},
-            {'n': 1, 's': None},
-            {'n': 1, 's': ''},
-            {'n': 1, 's': '123456789'},
-            {'n': 1, 'p': '123a'},
-            {'n': 1, 'l': None},
-            {'n': 1, 'l': [None]},
-            {'n': 1, 'l': [{}]},
-            {'n': 1, 'l': [{'s2': None}]},
-            {'n': 1, 'l': [{'s2': 1}]},
-            {'n': 1, 't': ()},
-            {'n': 0, 't': (3.1, u"joe")},
-            {'n': 0, 't': (u"joe", None)},
-            {'n': 1, 'h': {5: ["foo", u"bar"], "0": []}},
-            {'n': 1, 'h': {5: ["foo", 2.1], 0: []}},
-            {'n': 1, 'o': {}},
-            {'n': 1, 'o': {"i2": "2"}},
-        ]:
+        for invalid in _COMPLEX_INVALID_CASES:
             self.assertRaises(V.ValidationError,
                               self.complex_validator.validate, invalid)
 
     def test_complex_adaptation(self):
-        for value in [
-            {'n': 2},
-            {'n': 2.1, 'i': 3},
-            {'n': -1, 'b': False},
-            {'n': Decimal(3), 'e': "r"},
-            {'n': long(2), 'd': datetime.now()},
-            {'n': 0, 'd': date.today()},
-            {'n': 0, 's': "abc"},
-            {'n': 0, 'p': None},
-            {'n': 0, 'p': "123"},
-            {'n': 0, 'l': []},
-            {'n': 0, 'l': [{"s2": "foo"}, {"s2": ""}]},
-            {'n': 0, 't': (u"joe", 3.1)},
-            {'n': 0, 'h': {5: ["foo", u"bar"], 0: []}},
-            {'n': 0, 'o': {"i2": 3}},
-        ]:
+        for value in _COMPLEX_VALID_CASES:
             adapted = self.complex_validator.validate(value)
-            self.assertTrue(isinstance(adapted["n"], (int, long, float, Decimal)))
-            self.assertTrue(isinstance(adapted["i"], int_types))
-            self.assertTrue(adapted.get("b") is None or isinstance(adapted["b"], bool))
-            self.assertTrue(adapted.get("d") is None or isinstance(adapted["d"], (date, datetime)))
-            self.assertTrue(adapted.get("e") is None or adapted["e"] in "rgb")
-            self.assertTrue(adapted.get("s") is None or isinstance(adapted["s"], string_types))
-            self.assertTrue(adapted.get("l") is None or isinstance(adapted["l"], list))
-            self.assertTrue(adapted.get("t") is None or isinstance(adapted["t"], tuple))
-            self.assertTrue(adapted.get("h") is None or isinstance(adapted["h"], dict))
+            self.assertIsInstance(adapted["n"], (int, float, Decimal))
+            self.assertIsInstance(adapted["i"], int)
+            if adapted.get("b") is not None:
+                self.assertIsInstance(adapted["b"], bool)
+            if adapted.get("d") is not None:
+                self.assertIsInstance(adapted["d"], (date, datetime))
+            if adapted.get("e") is not None:
+                self.assertIn(adapted["e"], "rgb")
+            if adapted.get("s") is not None:
+                self.assertIsInstance(adapted["s"], str)
             if adapted.get("l") is not None:
-                self.assertTrue(all(isinstance(item["s2"], string_types)
-                                    for item in adapted["l"]))
+                self.assertIsInstance(adapted["l"], list)
+                self.assertTrue(all(isinstance(item["s2"], str) for item in adapted["l"]))
             if adapted.get("t") is not None:
+                self.assertIsInstance(adapted["t"], tuple)
                 self.assertEqual(len(adapted["t"]), 2)
-                self.assertTrue(isinstance(adapted["t"][0], text_type))
-                self.assertTrue(isinstance(adapted["t"][1], float))
+                self.assertIsInstance(adapted["t"][0], str)
+                self.assertIsInstance(adapted["t"][1], float)
             if adapted.get("h") is not None:
-                self.assertTrue(all(isinstance(key, int)
-                                    for key in adapted["h"].keys()))
-                self.assertTrue(all(isinstance(value_item, string_types)
-                                    for value in adapted["h"].values()
-                                    for value_item in value))
+                self.assertIsInstance(adapted["h"], dict)
+                self.assertTrue(all(isinstance(key, int) and all(isinstance(item, str) for item in items)
+                                    for key, items in adapted["h"].items()))
             if adapted.get("o") is not None:
-                self.assertTrue(isinstance(adapted["o"]["i2"], int_types))
+                self.assertIsInstance(adapted["o"]["i2"], int)
+
+    def test_compile(self):
+        schema = {
+            "foo": "number",
+            V.Optional("bar", 0): "integer",
+            V.Optional("baz", lambda: []): ["string"],
+            V.Optional("nested"): {"x": V.AdaptTo(int)},
+        }
+        validate = self.val_context.compile(schema)
+        self.assertIs(self.val_context.compile(schema), validate)
+        self.assertEqual(validate({"foo": 1}), {"foo": 1, "bar": 0, "baz": []})
+        self.assertEqual(validate({"foo": 1, "nested": {"x": "2"}, "quux": None}),
+                         {"foo": 1, "bar": 0, "baz": [], "nested": {"x": 2}, "quux": None})
+        for value, error in [
+            (42, "Invalid value 42 (int): must be Mapping"),
+            ({}, "Invalid value {} (dict): missing required properties: ['foo']"),
+            ({"foo": 1, "baz": [1]}, "Invalid value 1 (int): must be string (at baz[0])"),
+        ]:
+            with self.assertRaises(V.ValidationError) as cm:
+                validate(value)
+            self.assertEqual(cm.exception.to_text(), error)
+
+        for additional, value, result in [
+            (V.REMOVE, {"foo": 1, "x": 2}, {"foo": 1}),
+            ("integer", {"foo": 1, "x": 2}, {"foo": 1, "x": 2}),
+        ]:
+            validate = self.val_context.compile(V.Object({"foo": "number"}, additional=additional))
+            self.assertEqual(validate(value), result)
+        validate = self.val_context.compile(V.Object({"foo": "number"}, additional=False))
+        self.assertRaises(V.ValidationError, validate, {"foo": 1, "x": 2})
+        validate = self.val_context.compile(V.Object({V.Optional("foo"): "number"},
+                                                     ignore_optional_errors=True))
+        self.assertEqual(validate({"foo": "1"}), {})
+
+        for schema, valid, invalid in [("boolean", True, 1),
+                                       (Fraction(), 0.5, 1),
+                                       (V.String(max_length=1), "a", "ab")]:
+            validate = self.val_context.compile(schema)
+            self.assertEqual(validate(valid), valid)
+            self.assertRaises(V.ValidationError, validate, invalid)
+
+        # large objects are validated by their validate method
+        schema = {"p{}".format(i): "integer" for i in range(V.Object.max_unrolled_properties + 1)}
+        self.assertIsNone(self.val_context.emit(schema))
+        validate = self.val_context.compile(schema)
+        value = dict.fromkeys(schema, 1)
+        self.assertIs(validate(value), value)
+        self.assertRaises(V.ValidationError, validate, dict(value, p0="1"))
+
+        # the compiled functions take a single positional argument
+        for schema in int, {"foo": "number"}:
+            validate = self.val_context.compile(schema)
+            self.assertEqual(validate.__code__.co_argcount, 1)
+            self.assertRaises(TypeError, validate, "x", str)
+
+    def test_emit(self):
+        source = self.val_context.emit({"foo": "number", V.Optional("bar"): "integer"})
+        self.assertTrue(source.startswith("def validate(value, *, "))
+        # only the optional property is looked up before validation
+        self.assertEqual(source.count("in value"), 1)
+        self.assertNotIn("for ", source)
+        self.assertIsNone(self.val_context.emit(V.AdaptTo(int)))
+
+        # parsed objects are compiled to their generated code
+        validator = self.val_context.parse({"foo": "number"})
+        self.assertEqual(validator.compile().__code__.co_filename, "<valideero validate>")
+        self.assertEqual(self.val_context.compile({"foo": "number"}).__code__.co_filename, "<valideero validate>")
+
+        # the validators that only delegate to another one compile to it directly
+        integer_source = self.val_context.emit("integer")
+        for schema in V.Range("integer"), V.AllOf("integer"), V.ChainOf("integer"):
+            compiled = self.val_context.parse(schema).compile()
+            self.assertEqual(compiled.__code__.co_filename, "<valideero validate>")
+            self.assertEqual(compiled.__kwdefaults__, self.val_context.parse("integer").compile().__kwdefaults__)
+        self.assertNotEqual(self.val_context.emit(V.Range("integer", min_value=0)), integer_source)
+        nullable = self.val_context.parse(V.Nullable("integer"))
+        self.assertIsInstance(nullable.compile().__self__, V.AnyOf)
+
+        # the type checks are specialized for the accepted and rejected types
+        source = self.val_context.emit(int)
+        self.assertIn("type(value) is not _accept", source)
+        self.assertNotIn("_reject", source)
+        source = self.val_context.emit("integer")
+        self.assertNotIn("type(value) is", source)
+        self.assertIn("isinstance(value, _reject)", source)
+        self.assertNotIn("type(value) is", self.val_context.emit(V.Type(bool, reject_types=int)))
+
+        # only the given bounds are checked and the nested validators are compiled
+        for schema, names, missing_names in [
+            (V.Range("number", min_value=1), ["_validate", "_min_value"], ["_max_value"]),
+            (V.String(max_length=2), ["_max_length"], ["_min_length"]),
+            (V.HomogeneousSequence("integer", min_length=1), ["_validate_item", "_min_length"], ["_max_length"]),
+            (V.Mapping(value_schema="integer"), ["_validate_value"], ["_validate_key"]),
+            (V.Pattern("a+"), ["_match(value)"], ["Type"]),
+            (V.NoneValue(list), ["return _default()"], ["callable"]),
+            (V.NoneValue(0), ["return _default\n"], ["callable"]),
+            (V.AllOf("number", int), ["_V0(value)", "return _V1(value)"], ["for "]),
+            (V.ChainOf(V.AdaptTo(int), "integer"), ["value = _V0(value)", "value = _V1(value)"], ["for "]),
+        ]:
+            source = self.val_context.emit(schema)
+            for name in names:
+                self.assertIn(name, source)
+            for name in missing_names:
+                self.assertNotIn(name, source)
 
     def test_humanized_names(self):
+        self.val_context = prepare_val_context()
         class DummyValidator(V.Validator):
             name = "dummy"
 
@@ -603,29 +984,82 @@ class TestValidator(unittest.TestCase):
         validator = self.val_context.parse(Date())
         self.assertEqual(validator.humanized_name, "date or datetime")
 
+    def test_type_names(self):
+        type_names = V.TypeNames()
+        self.assertEqual(type_names.get_type_name(int), "int")
+        self.assertEqual(type_names.format_types((int, float)), "int or float")
+        type_names.set_name_for_types("number", int, float)
+        self.assertEqual(type_names.get_type_name(int), "number")
+        self.assertEqual(type_names.format_types((bool, int, float)), "bool, number or number")
+        self.assertEqual(type_names.format_types((int, float)), "number or number")
+        self.assertEqual(type_names.format_types([bool, int]), "bool or number")
+
+    def test_reprs(self):
+        from valideero.compat import compatible_repr, json_repr
+        for x, compatible, json in [(1, "1", "1"), (1.5, "1.5", "1.5"), (True, "True", "true"),
+                                    (None, "None", "null"), ("a", "'a'", '"a"'), ([None], "[None]", "[null]")]:
+            self.assertEqual(compatible_repr(x), compatible)
+            self.assertEqual(json_repr(x), json)
+        self.assertEqual(json_repr(10 ** 50), compatible_repr(10 ** 50))
+        self.assertIn("...", json_repr(10 ** 50))
+
     def test_error_message(self):
-        self._testValidation({"foo": "number", V.Optional("bar"): ["integer"]}, errors=[
+        self._testValidation({"foo": "number", V.Optional("bar"): ["integer"]}, errors=(
             (42,
              "Invalid value 42 (int): must be Mapping"),
             ({},
              "Invalid value {} (dict): missing required properties: ['foo']"),
             ({"foo": b"3"},
-             "Invalid value '3' ({}): must be number (at foo)".format(binary_type.__name__)),
+             "Invalid value '3' (bytes): must be number (at foo)"),
             ({"foo": "3"},
-             "Invalid value '3' ({}): must be number (at foo)".format(text_type.__name__)),
+             "Invalid value '3' (str): must be number (at foo)"),
             ({"foo": 3, "bar": None},
              "Invalid value None (NoneType): must be Sequence (at bar)"),
             ({"foo": 3, "bar": [1, "2", 3]},
-             "Invalid value '2' ({}): must be integer (at bar[1])".format(text_type.__name__)),
-        ])
+             "Invalid value '2' (str): must be integer (at bar[1])"),
+        ))
 
     def test_error_properties(self):
         for contexts in [], ['bar'], ['bar', 'baz']:
             ex = V.ValidationError(self.val_context, 'foo')
             for context in contexts:
                 ex.add_error_path_item(context)
-            self.assertEqual(ex.message, text_type(ex))
-            self.assertEqual(ex.args, (text_type(ex),))
+            self.assertEqual(ex.message, str(ex))
+            self.assertEqual(ex.args, (str(ex),))
+
+    def test_error_message_is_lazy(self):
+        class Unnamed(V.Type):
+            accept_types = int
+
+            @property
+            def humanized_name(self):
+                raise AssertionError("message formatted")
+
+        validator = self.val_context.parse(V.AnyOf(Unnamed(), "boolean"))
+        self.assertFalse(validator.is_valid("x"))
+        with self.assertRaises(V.ValidationError) as cm:
+            validator.validate("x")
+        self.assertRaises(AssertionError, cm.exception.to_text)
+
+        self.assertEqual(V.ValidationError(self.val_context, b"foo").msg, "foo")
+        self.assertEqual(V.ValidationError(self.val_context, lambda: "foo", 1).to_text(),
+                         "Invalid value 1 (int): foo")
+
+    def test_error_path_text(self):
+        ex = V.ValidationError(self.val_context, 'foo', 1)
+        self.assertEqual(ex.to_text(), "Invalid value 1 (int): foo")
+        ex.add_error_path_item(0)
+        self.assertEqual(ex.to_text(), "Invalid value 1 (int): foo (at value[0])")
+        ex.add_error_path_item("bar")
+        self.assertEqual(ex.to_text(), "Invalid value 1 (int): foo (at bar[0])")
+        ex.add_error_path_item(2)
+        self.assertEqual(ex.to_text(), "Invalid value 1 (int): foo (at value[2]['bar'][0])")
+        self.assertIs(ex.to_text(), ex.to_text())
+        self.assertEqual(ex.error_path, (2, ("bar", (0, None))))
+        self.assertEqual(ex.error_path_items, [0, "bar", 2])
+        ex.error_path_items = [1, "baz"]
+        self.assertEqual(ex.error_path, ("baz", (1, None)))
+        self.assertEqual(ex.to_text(), "Invalid value 1 (int): foo (at baz[1])")
 
     def test_error_message_json_type_names(self):
         self.val_context = V.make_json_validation_context()
@@ -635,7 +1069,7 @@ class TestValidator(unittest.TestCase):
                               V.Optional("baz"): V.AnyOf("number", ["number"]),
                               V.Optional("opt"): V.Nullable("string")},
                              errors=
-                             [(42, "Invalid value 42 (integer): must be object"),
+                             ((42, "Invalid value 42 (integer): must be object"),
                               ({},
                                'Invalid value {} (object): missing required properties: ["foo"]'),
                               ({"foo": "3"},
@@ -649,23 +1083,27 @@ class TestValidator(unittest.TestCase):
                               ({"foo": 3, "baz": "23"},
                                'Invalid value "23" (string): must be number or must be array (at baz)'),
                               ({"foo": 3, "opt": 12},
-                               "Invalid value 12 (integer): must be string or must be null (at opt)")])
+                               "Invalid value 12 (integer): must be string or must be null (at opt)")))
 
     def _testValidation(self, obj, invalid=(), valid=(), adapted=(), errors=()):
+        # the context caches the parsed schemas (keeping them alive), so a schema
+        # that is tested repeatedly is parsed once
         validator = self.val_context.parse(obj)
-        for from_value, to_value in [(value, value) for value in valid] + list(adapted):
-            self.assertTrue(validator.is_valid(from_value))
-            adapted_value = validator.validate(from_value)
+        for from_value, to_value in chain(((value, value) for value in valid), adapted):
+            try:
+                adapted_value = validator.validate(from_value)
+            except V.ValidationError as ex:
+                self.fail("Unexpected error: {}".format(ex.to_text()))
             self.assertIs(adapted_value.__class__, to_value.__class__)
             self.assertEqual(adapted_value, to_value)
-        for value, error in [(value, None) for value in invalid] + list(errors):
-            self.assertFalse(validator.is_valid(value))
+        for value, error in chain(((value, None) for value in invalid), errors):
             try:
                 validator.validate(value)
             except V.ValidationError as ex:
                 if error:
-                    error_text = ex.to_text()
-                    self.assertEqual(error_text, error, "Actual error: {}".format(error_text))
+                    self.assertEqual(ex.to_text(), error)
+            else:
+                self.fail("{!r} is valid".format(value))
 
 
 if __name__ == '__main__':
@@ -1,9 +1,5 @@
 # -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
-from collections import Sequence, Mapping
-
-from .compat import int_types, binary_type, text_type
+from collections.abc import Sequence, Mapping
 
 from .validators import make_default_validation_context
 
@@ -13,19 +9,26 @@ from .compat import json_repr
 __all__ = ["make_validation_context", "make_json_validation_context"]
 
 
+_JSON_TYPE_NAMES = (
+    ("null", (type(None),)),
+    ("integer", (int,)),
+    ("number", (float,)),
+    ("string", (bytes, str)),
+    ("array", (list, Sequence)),
+    ("object", (dict, Mapping)),
+)
+
+
 def make_validation_context():
     val_context = make_default_validation_context()
-    val_context.type_names.set_name_for_types("string", binary_type, text_type)
+    val_context.type_names.set_name_for_types("string", bytes, str)
     return val_context
 
 
 def make_json_validation_context():
     val_context = make_validation_context()
     val_context.repr = json_repr
-    val_context.type_names.set_name_for_types("null", type(None))
-    val_context.type_names.set_name_for_types("integer", *int_types)
-    val_context.type_names.set_name_for_types("number", float)
-    val_context.type_names.set_name_for_types("string", binary_type, text_type)
-    val_context.type_names.set_name_for_types("array", list, Sequence)
-    val_context.type_names.set_name_for_types("object", dict, Mapping)
+    set_name_for_types = val_context.type_names.set_name_for_types
+    for name, types in _JSON_TYPE_NAMES:
+        set_name_for_types(name, *types)
     return val_context
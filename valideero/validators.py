@@ -1,14 +1,13 @@
 # -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
-import collections
+import abc
+import collections.abc
 import datetime
-import inspect
 import numbers
 import re
+from functools import partial
 
-from .base import Validator, ValidationError, ValidationContext, UNDEFINED, TypeNames
-from .compat import string_types, izip, imap, iteritems, text_type, binary_type, unicode_safe, compatible_repr
+from .base import Validator, ValidationError, ValidationContext, UNDEFINED, TypeNames, _parsing_options_changed
+from .compat import unicode_safe, compatible_repr
 
 __all__ = [
     "AnyOf", "AllOf", "ChainOf", "Nullable", "NoneValue",
@@ -24,17 +23,27 @@ class Composite(Validator):
     def __init__(self, *schemas):
         super(Composite, self).__init__()
         self._schemas = schemas
-        self._validators = []
+        self._validators = ()
 
     def parse(self):
         if hasattr(self, '_schemas'):
-            self._validators = list(imap(self.val_context.parse, self._schemas))
+            self._validators = tuple(map(self.val_context.parse, self._schemas))
             del self._schemas
 
     def validate(self, value):
         raise NotImplementedError()
 
 
+def _checks_without_errors(validator):
+    """Check if the :py:meth:`Validator.is_valid` of ``validator`` raises no errors.
+
+    The overrides of ``is_valid`` only apply to the ``validate`` method of their
+    class and fall back to validating the value otherwise.
+    """
+    cls = next(c for c in type(validator).__mro__ if "is_valid" in c.__dict__)
+    return cls is not Validator and not validator._overrides(cls)
+
+
 class AnyOf(Composite):
     """A composite validator that accepts values accepted by any of its component
     validators.
@@ -43,14 +52,41 @@ class AnyOf(Composite):
     is used.
     """
 
+    def __init__(self, *schemas):
+        super(AnyOf, self).__init__(*schemas)
+        self._checked_validators = ()
+
+    def freeze(self):
+        """Mark the pure validators that tell valid values without raising errors.
+
+        The other ones are validated once and their errors are kept.
+        """
+        self._checked_validators = tuple(
+            (validator, validator.is_pure and _checks_without_errors(validator))
+            for validator in self._validators)
+
     def validate(self, value):
-        messages = []
-        for validator in self._validators:
-            try:
-                return validator.validate(value)
-            except ValidationError as ex:
-                messages.append(ex.msg)
-        raise ValidationError(self.val_context, " or ".join(messages), value)
+        errors = []
+        for validator, checked in self._checked_validators:
+            if checked:
+                # the value itself is the result if valid
+                if validator.is_valid(value):
+                    return value
+                errors.append(None)
+            else:
+                try:
+                    return validator.validate(value)
+                except ValidationError as ex:
+                    errors.append(ex)
+        # all of them failed: only the checked validators are run again, to get
+        # their error messages
+        for i, validator in enumerate(self._validators):
+            if errors[i] is None:
+                try:
+                    validator.validate(value)
+                except ValidationError as ex:
+                    errors[i] = ex
+        raise ValidationError(self.val_context, lambda: " or ".join(ex.msg for ex in errors), value)
 
     @property
     def humanized_name(self):
@@ -70,6 +106,24 @@ class AllOf(Composite):
             result = validator.validate(value)
         return result
 
+    def compile(self):
+        if not self._overrides(AllOf) and len(self._validators) == 1:
+            # a single validator validates exactly like its AllOf
+            return self._validators[0].compile()
+        return super(AllOf, self).compile()
+
+    def emit(self):
+        if self._overrides(AllOf):
+            return None
+        names = ["_V{}".format(i) for i in range(len(self._validators))]
+        namespace = dict(zip(names, (validator.compile() for validator in self._validators)))
+        if not names:
+            return ["    return value"], namespace
+        # the result of the last validator is returned
+        lines = ["    {}(value)".format(name) for name in names[:-1]]
+        lines.append("    return {}(value)".format(names[-1]))
+        return lines, namespace
+
     @property
     def humanized_name(self):
         return " and ".join(v.humanized_name for v in self._validators)
@@ -86,6 +140,23 @@ class ChainOf(Composite):
             value = validator.validate(value)
         return value
 
+    def compile(self):
+        if not self._overrides(ChainOf) and len(self._validators) == 1:
+            # a single validator validates exactly like its ChainOf
+            return self._validators[0].compile()
+        return super(ChainOf, self).compile()
+
+    def emit(self):
+        if self._overrides(ChainOf):
+            return None
+        namespace = {}
+        lines = []
+        for i, validator in enumerate(self._validators):
+            namespace["_V{}".format(i)] = validator.compile()
+            lines.append("    value = _V{}(value)".format(i))
+        lines.append("    return value")
+        return lines, namespace
+
     @property
     def humanized_name(self):
         return " chained to ".join(v.humanized_name for v in self._validators)
@@ -102,11 +173,31 @@ class NoneValue(Validator):
         self._default = default
         super(NoneValue, self).__init__()
 
+    @property
+    def is_pure(self):
+        return self._default is None
+
     def validate(self, value):
         if value is not None:
             self.error(value)
         return self._default if not callable(self._default) else self._default()
 
+    def is_valid(self, value):
+        if self._overrides(NoneValue):
+            return super(NoneValue, self).is_valid(value)
+        return value is None
+
+    def emit(self):
+        if self._overrides(NoneValue):
+            return None
+        lines = [
+            "    if value is not None:",
+            "        _self.error(value)",
+            # a callable default is detected once, not for every value
+            "    return _default()" if callable(self._default) else "    return _default",
+        ]
+        return lines, {"_self": self, "_default": self._default}
+
     @property
     def humanized_name(self):
         return self.val_context.type_names.get_type_name(type(None))
@@ -130,12 +221,19 @@ class Nullable(Validator):
             validator = self.val_context.parse(self._schema)
             none_validator = self.val_context.parse(NoneValue(self._default))
             if isinstance(validator, AnyOf):
-                validator._validators.append(none_validator)
-                self._validator = validator
+                # extend a new AnyOf, as the parsed one may be shared with other schemas
+                validators = validator._validators + (none_validator,)
             else:
-                self._validator = self.val_context.parse(AnyOf(validator, none_validator))
+                validators = (validator, none_validator)
+            self._validator = self.val_context.parse(AnyOf(*validators))
             del self._schema
 
+    def compile(self):
+        if not self._overrides(Nullable):
+            # validate with the AnyOf directly
+            return self._validator.compile()
+        return super(Nullable, self).compile()
+
     def validate(self, value):
         return self._validator.validate(value)
 
@@ -152,6 +250,7 @@ class Enum(Validator):
     """
 
     values = ()
+    is_pure = True
 
     def __init__(self, *values):
         super(Enum, self).__init__()
@@ -170,9 +269,30 @@ class Enum(Validator):
             pass
         self.error(value)
 
+    def is_valid(self, value):
+        if self._overrides(Enum):
+            return super(Enum, self).is_valid(value)
+        try:
+            return value in self.values
+        except TypeError:  # unhashable
+            return False
+
+    def emit(self):
+        if self._overrides(Enum):
+            return None
+        lines = [
+            "    try:",
+            "        if value in _self.values:",
+            "            return value",
+            "    except TypeError:  # unhashable",
+            "        pass",
+            "    _self.error(value)",
+        ]
+        return lines, {"_self": self}
+
     @property
     def humanized_name(self):
-        return "one of {{{}}}".format(", ".join(list(imap(self.val_context.repr, self.values))))
+        return "one of {{{}}}".format(", ".join(map(self.val_context.repr, self.values)))
 
 
 class Condition(Validator):
@@ -181,10 +301,12 @@ class Condition(Validator):
     A value is accepted if ``predicate(value)`` is true.
     """
 
+    is_pure = True
+
     def __init__(self, predicate, traps=Exception):
         super(Condition, self).__init__()
-        if not (callable(predicate) and not inspect.isclass(predicate)):
-            raise TypeError("Callable expected, {} given".format(unicode_safe(predicate.__class__)))
+        if not (callable(predicate) and not isinstance(predicate, type)):
+            raise TypeError("Callable expected, {} given".format(predicate.__class__))
         self._predicate = predicate
         self._traps = traps
 
@@ -202,19 +324,17 @@ class Condition(Validator):
 
         return value
 
-    def error(self, value):
-        raise ValidationError(self.val_context,
-                              "must satisfy predicate {}".format(self.humanized_name),
-                              value)
+    def _error_message(self):
+        return "must satisfy predicate {}".format(self.humanized_name)
 
     @property
     def humanized_name(self):
-        return text_type(getattr(self._predicate, "__name__", self._predicate))
+        return str(getattr(self._predicate, "__name__", self._predicate))
 
 
 def condition_factory(obj):
     """Parse a callable as a Condition validator."""
-    if callable(obj) and not inspect.isclass(obj):
+    if callable(obj) and not isinstance(obj, type):
         return Condition(obj)
 
 
@@ -239,7 +359,7 @@ class AdaptBy(Validator):
         try:
             return self._adaptor(value)
         except self._traps as ex:
-            raise ValidationError(self.val_context, text_type(ex), value)
+            raise ValidationError(self.val_context, str(ex), value)
 
 
 class AdaptTo(AdaptBy):
@@ -256,8 +376,8 @@ class AdaptTo(AdaptBy):
             returned as is. If True, only instances of ``target_cls`` are
             returned as is.
         """
-        if not inspect.isclass(target_cls):
-            raise TypeError("Type expected, {} given".format(unicode_safe(target_cls.__name__)))
+        if not isinstance(target_cls, type):
+            raise TypeError("Type expected, {} given".format(target_cls.__name__))
         self._exact = exact
         super(AdaptTo, self).__init__(target_cls, traps)
 
@@ -278,6 +398,7 @@ class Type(Validator):
 
     accept_types = ()
     reject_types = ()
+    is_pure = True
 
     def __init__(self, accept_types=None, reject_types=None):
         if accept_types is not None:
@@ -291,6 +412,40 @@ class Type(Validator):
             self.error(value)
         return value
 
+    def is_valid(self, value):
+        if self._overrides(Type):
+            return super(Type, self).is_valid(value)
+        return isinstance(value, self.accept_types) and not isinstance(value, self.reject_types)
+
+    def emit(self):
+        if self._overrides(Type):
+            return None
+        lines, namespace = self._emit_type_check()
+        lines.append("    return value")
+        return lines, namespace
+
+    def _emit_type_check(self):
+        """Generate the type check of :py:meth:`validate` for the ``emit`` of subclasses.
+
+        :returns: The ``(body_lines, namespace)`` of the check, which calls
+            ``_self.error(value)`` if ``value`` has an invalid type.
+        """
+        accept_types, reject_types = self.accept_types, self.reject_types
+        namespace = {"_self": self, "_accept": accept_types}
+        condition = "not isinstance(value, _accept)"
+        if reject_types != ():
+            namespace["_reject"] = reject_types
+            condition += " or isinstance(value, _reject)"
+        if (isinstance(accept_types, type) and not isinstance(accept_types, abc.ABCMeta)
+                and not issubclass(accept_types, reject_types)):
+            # values of exactly the accepted type skip the isinstance checks
+            condition = "type(value) is not _accept and ({})".format(condition)
+        lines = [
+            "    if {}:".format(condition),
+            "        _self.error(value)",
+        ]
+        return lines, namespace
+
     @property
     def humanized_name(self):
         return self.name or self.val_context.type_names.format_types(self.accept_types)
@@ -298,10 +453,13 @@ class Type(Validator):
 
 def type_factory(obj):
     """Parse a python type (or "old-style" class) as a :py:class:`Type` instance."""
-    if inspect.isclass(obj):
+    if isinstance(obj, type):
         return Type(accept_types=obj)
 
 
+type_factory.schema_types = (type,)
+
+
 class Boolean(Type):
     """A validator that accepts bool values."""
 
@@ -343,20 +501,60 @@ class Range(Validator):
             self._validator = self.val_context.parse(self._schema)
             del self._schema
 
+    @property
+    def is_pure(self):
+        return self._validator is None or self._validator.is_pure
+
+    def compile(self):
+        if (not self._overrides(Range) and self._validator is not None
+                and self._min_value is None and self._max_value is None):
+            # without bounds a range validates exactly like its schema
+            return self._validator.compile()
+        return super(Range, self).compile()
+
     def validate(self, value):
         if self._validator is not None:
             value = self._validator.validate(value)
 
         if self._min_value is not None and value < self._min_value:
-            raise ValidationError(self.val_context,
-                                  "must not be less than {}".format(self._min_value),
-                                  value)
+            self._min_value_error(value)
         if self._max_value is not None and value > self._max_value:
-            raise ValidationError(self.val_context,
-                                  "must not be larger than {}".format(self._max_value),
-                                  value)
+            self._max_value_error(value)
         return value
 
+    def emit(self):
+        if self._overrides(Range):
+            return None
+        namespace = {"_self": self}
+        lines = []
+        if self._validator is not None:
+            namespace["_validate"] = self._validator.compile()
+            lines.append("    value = _validate(value)")
+        if self._min_value is not None:
+            namespace["_min_value"] = self._min_value
+            lines += [
+                "    if value < _min_value:",
+                "        _self._min_value_error(value)",
+            ]
+        if self._max_value is not None:
+            namespace["_max_value"] = self._max_value
+            lines += [
+                "    if value > _max_value:",
+                "        _self._max_value_error(value)",
+            ]
+        lines.append("    return value")
+        return lines, namespace
+
+    def _min_value_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("must not be less than {}".format, self._min_value),
+                              value)
+
+    def _max_value_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("must not be larger than {}".format, self._max_value),
+                              value)
+
 
 class Number(Type):
     """A validator that accepts any numbers (but not bool)."""
@@ -391,7 +589,8 @@ class String(Type):
     """A validator that accepts string values."""
 
     name = "string"
-    accept_types = string_types
+    accept_types = str
+    is_pure = True
 
     def __init__(self, min_length=None, max_length=None):
         """Instantiate a String validator.
@@ -408,15 +607,58 @@ class String(Type):
     def validate(self, value):
         super(String, self).validate(value)
         if self._min_length is not None and len(value) < self._min_length:
-            raise ValidationError(self.val_context,
-                                  "must be at least {} characters long".format(self._min_length),
-                                  value)
+            self._min_length_error(value)
         if self._max_length is not None and len(value) > self._max_length:
-            raise ValidationError(self.val_context,
-                                  "must be at most {} characters long".format(self._max_length),
-                                  value)
+            self._max_length_error(value)
         return value
 
+    def is_valid(self, value):
+        if self._overrides(String):
+            return super(String, self).is_valid(value)
+        return (isinstance(value, self.accept_types) and not isinstance(value, self.reject_types)
+                and (self._min_length is None or len(value) >= self._min_length)
+                and (self._max_length is None or len(value) <= self._max_length))
+
+    def emit(self):
+        if self._overrides(String):
+            return None
+        lines, namespace = self._emit_type_check()
+        lines += _emit_length_checks(self._min_length, self._max_length, namespace)
+        lines.append("    return value")
+        return lines, namespace
+
+    def _min_length_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("must be at least {} characters long".format, self._min_length),
+                              value)
+
+    def _max_length_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("must be at most {} characters long".format, self._max_length),
+                              value)
+
+
+def _emit_length_checks(min_length, max_length, namespace):
+    """Generate the checks of ``len(value)`` against the bounds that are not None.
+
+    They call the ``_min_length_error`` and ``_max_length_error`` methods of
+    ``_self`` for invalid values.
+    """
+    lines = []
+    if min_length is not None:
+        namespace["_min_length"] = min_length
+        lines += [
+            "    if len(value) < _min_length:",
+            "        _self._min_length_error(value)",
+        ]
+    if max_length is not None:
+        namespace["_max_length"] = max_length
+        lines += [
+            "    if len(value) > _max_length:",
+            "        _self._max_length_error(value)",
+        ]
+    return lines
+
 
 _SRE_Pattern = type(re.compile(""))
 
@@ -427,7 +669,8 @@ class Pattern(Type):
     Attributes:
         - regexp: The regular expression (string or compiled) to be matched.
     """
-    accept_types = string_types
+    accept_types = str
+    is_pure = True
 
     def __init__(self, regexp):
         super(Pattern, self).__init__()
@@ -439,10 +682,26 @@ class Pattern(Type):
             self.error(value)
         return value
 
-    def error(self, value):
-        raise ValidationError(self.val_context,
-                              "must match {}".format(self.humanized_name),
-                              value)
+    def is_valid(self, value):
+        if self._overrides(Pattern):
+            return super(Pattern, self).is_valid(value)
+        return (isinstance(value, self.accept_types) and not isinstance(value, self.reject_types)
+                and self.regexp.match(value) is not None)
+
+    def emit(self):
+        if self._overrides(Pattern):
+            return None
+        lines, namespace = self._emit_type_check()
+        namespace["_match"] = self.regexp.match
+        lines += [
+            "    if not _match(value):",
+            "        _self.error(value)",
+            "    return value",
+        ]
+        return lines, namespace
+
+    def _error_message(self):
+        return "must match {}".format(self.humanized_name)
 
     @property
     def humanized_name(self):
@@ -455,11 +714,14 @@ def pattern_factory(obj):
         return Pattern(obj)
 
 
+pattern_factory.schema_types = (_SRE_Pattern,)
+
+
 class HomogeneousSequence(Type):
     """A validator that accepts homogeneous, non-fixed size sequences."""
 
-    accept_types = collections.Sequence
-    reject_types = string_types
+    accept_types = collections.abc.Sequence
+    reject_types = str
 
     def __init__(self, item_schema=None, min_length=None, max_length=None):
         """Instantiate a :py:class:`HomogeneousSequence` validator.
@@ -471,33 +733,111 @@ class HomogeneousSequence(Type):
         self._min_length = min_length
         self._max_length = max_length
         self._item_validator = None
+        self._type_checked_items = False
+
+    def __init_subclass__(cls, **kwargs):
+        super(HomogeneousSequence, cls).__init_subclass__(**kwargs)
+        if "_iter_validated_items" in cls.__dict__ and "_validated_items" not in cls.__dict__:
+            # subclasses that override the former hook are still validated with it
+            def _validated_items(self, value):
+                return list(self._iter_validated_items(value))
+            cls._validated_items = _validated_items
 
     def parse(self):
         if hasattr(self, '_item_schema') and self._item_schema is not None:
             self._item_validator = self.val_context.parse(self._item_schema)
+            # plain Type items are accepted or rejected by their type alone,
+            # without being adapted, unless a subclass validates the items itself
+            self._type_checked_items = (not self._item_validator._overrides(Type)
+                                        and type(self)._validated_items is HomogeneousSequence._validated_items)
             del self._item_schema
 
     def validate(self, value):
         super(HomogeneousSequence, self).validate(value)
         if self._min_length is not None and len(value) < self._min_length:
-            raise ValidationError(self.val_context,
-                                  "must contain at least {} elements".format(self._min_length),
-                                  value)
+            self._min_length_error(value)
         if self._max_length is not None and len(value) > self._max_length:
-            raise ValidationError(self.val_context,
-                                  "must contain at most {} elements".format(self._max_length),
-                                  value)
+            self._max_length_error(value)
         if self._item_validator is None:
             return value
-        return value.__class__(self._iter_validated_items(value))
+        if self._type_checked_items and self._check_item_types(value):
+            return value.__class__(value)
+        items = self._validated_items(value)
+        return items if value.__class__ is list else value.__class__(items)
+
+    def emit(self):
+        if (self._overrides(HomogeneousSequence)
+                or type(self)._validated_items is not HomogeneousSequence._validated_items):
+            return None
+        lines, namespace = self._emit_type_check()
+        lines += _emit_length_checks(self._min_length, self._max_length, namespace)
+        if self._item_validator is None:
+            lines.append("    return value")
+            return lines, namespace
+        if self._type_checked_items:
+            namespace["_check_item_types"] = self._check_item_types
+            lines += [
+                "    if _check_item_types(value):",
+                "        return value.__class__(value)",
+            ]
+        namespace["_validate_item"] = self._item_validator.compile()
+        namespace["ValidationError"] = ValidationError
+        lines += [
+            "    items = []",
+            "    append = items.append",
+            "    try:",
+            "        for item in value:",
+            "            append(_validate_item(item))",
+            "    except ValidationError as ex:",
+            "        raise ex.add_error_path_item(len(items))",
+            "    return items if value.__class__ is list else value.__class__(items)",
+        ]
+        return lines, namespace
+
+    def _min_length_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("must contain at least {} elements".format, self._min_length),
+                              value)
 
-    def _iter_validated_items(self, value):
+    def _max_length_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("must contain at most {} elements".format, self._max_length),
+                              value)
+
+    def _check_item_types(self, value):
+        """Check all the items at once when they are validated by a plain :py:class:`Type`.
+
+        Each distinct item type is checked once instead of every item. It returns
+        ``False`` if any item is invalid, so that the items are validated one by
+        one to report the first invalid one.
+        """
+        accept_types = self._item_validator.accept_types
+        reject_types = self._item_validator.reject_types
+        for item_type in set(map(type, value)):
+            if not issubclass(item_type, accept_types) or issubclass(item_type, reject_types):
+                return False
+        return True
+
+    def _validated_items(self, value):
+        """Return the list of the validated items of ``value``."""
         validate_item = self._item_validator.validate
-        for i, item in enumerate(value):
-            try:
-                yield validate_item(item)
-            except ValidationError as ex:
-                raise ex.add_error_path_item(i)
+        items = []
+        append = items.append
+        try:
+            for item in value:
+                append(validate_item(item))
+        except ValidationError as ex:
+            # the items before the invalid one have been appended
+            raise ex.add_error_path_item(len(items))
+        return items
+
+    def _iter_validated_items(self, value):
+        """Yield the validated items of ``value``.
+
+        It is kept for the subclasses that override it, which are validated with
+        it instead of :py:meth:`_validated_items`.
+        """
+        yield from HomogeneousSequence._validated_items(self, value)
 
 
 def homogeneous_sequence_factory(obj):
@@ -508,11 +848,17 @@ def homogeneous_sequence_factory(obj):
         return HomogeneousSequence(*obj)
 
 
+homogeneous_sequence_factory.schema_types = (list,)
+
+
 class HeterogeneousSequence(Type):
     """A validator that accepts heterogeneous, fixed size sequences."""
 
-    accept_types = collections.Sequence
-    reject_types = string_types
+    accept_types = collections.abc.Sequence
+    reject_types = str
+
+    #: Sequences with more items are validated in a loop instead of generated code
+    max_unrolled_items = 16
 
     def __init__(self, *item_schemas):
         """Instantiate a :py:class:`HeterogeneousSequence` validator.
@@ -521,23 +867,50 @@ class HeterogeneousSequence(Type):
         """
         super(HeterogeneousSequence, self).__init__()
         self._item_schemas = item_schemas
-        self._item_validators = []
+        self._item_validators = ()
 
     def parse(self):
         if hasattr(self, '_item_schemas'):
-            self._item_validators = list(imap(self.val_context.parse, self._item_schemas))
+            self._item_validators = tuple(map(self.val_context.parse, self._item_schemas))
             del self._item_schemas
 
     def validate(self, value):
         super(HeterogeneousSequence, self).validate(value)
         if len(value) != len(self._item_validators):
-            raise ValidationError(self.val_context,
-                                  "{} items expected, {} found".format(len(self._item_validators), len(value)),
-                                  value)
+            self._length_error(value)
         return value.__class__(self._iter_validated_items(value))
 
+    def emit(self):
+        """Generate the body of a validation function with the items unrolled."""
+        if (self._overrides(HeterogeneousSequence)
+                or len(self._item_validators) > self.max_unrolled_items):
+            return None
+        lines, namespace = self._emit_type_check()
+        namespace["_length"] = len(self._item_validators)
+        namespace["ValidationError"] = ValidationError
+        lines += [
+            "    if len(value) != _length:",
+            "        _self._length_error(value)",
+        ]
+        for i, validator in enumerate(self._item_validators):
+            namespace["_V{}".format(i)] = validator.compile()
+            lines += [
+                "    try:",
+                "        item{0} = _V{0}(value[{0}])".format(i),
+                "    except ValidationError as ex:",
+                "        raise ex.add_error_path_item({})".format(i),
+            ]
+        lines.append("    return value.__class__(({}))".format(
+            "".join("item{}, ".format(i) for i in range(len(self._item_validators)))))
+        return lines, namespace
+
+    def _length_error(self, value):
+        raise ValidationError(self.val_context,
+                              partial("{} items expected, {} found".format, len(self._item_validators), len(value)),
+                              value)
+
     def _iter_validated_items(self, value):
-        for i, (validator, item) in enumerate(izip(self._item_validators, value)):
+        for i, (validator, item) in enumerate(zip(self._item_validators, value)):
             try:
                 yield validator.validate(item)
             except ValidationError as ex:
@@ -553,10 +926,13 @@ def heterogeneous_sequence_factory(obj):
         return HeterogeneousSequence(*obj)
 
 
+heterogeneous_sequence_factory.schema_types = (tuple,)
+
+
 class Mapping(Type):
-    """A validator that accepts mappings (:py:class:`collections.Mapping` instances)."""
+    """A validator that accepts mappings (:py:class:`collections.abc.Mapping` instances)."""
 
-    accept_types = collections.Mapping
+    accept_types = collections.abc.Mapping
 
     def __init__(self, key_schema=None, value_schema=None):
         """Instantiate a :py:class:`Mapping` validator.
@@ -570,6 +946,14 @@ class Mapping(Type):
         self._key_validator = None
         self._value_validator = None
 
+    def __init_subclass__(cls, **kwargs):
+        super(Mapping, cls).__init_subclass__(**kwargs)
+        if "_iter_validated_items" in cls.__dict__ and "_validated_items" not in cls.__dict__:
+            # subclasses that override the former hook are still validated with it
+            def _validated_items(self, value):
+                return dict(self._iter_validated_items(value))
+            cls._validated_items = _validated_items
+
     def parse(self):
         if hasattr(self, '_key_schema'):
             if self._key_schema is not None:
@@ -581,23 +965,65 @@ class Mapping(Type):
 
     def validate(self, value):
         super(Mapping, self).validate(value)
-        return value.__class__(self._iter_validated_items(value))
+        items = self._validated_items(value)
+        return items if value.__class__ is dict else value.__class__(items.items())
 
-    def _iter_validated_items(self, value):
+    def emit(self):
+        if self._overrides(Mapping) or type(self)._validated_items is not Mapping._validated_items:
+            return None
+        lines, namespace = self._emit_type_check()
+        if self._key_validator is not None:
+            namespace["_validate_key"] = self._key_validator.compile()
+        if self._value_validator is None:
+            if self._key_validator is None:
+                lines.append("    items = dict(value)")
+            else:
+                lines.append("    items = {_validate_key(k): v for k, v in value.items()}")
+        else:
+            # a loop rather than a comprehension, to know the key of an invalid value
+            namespace["_validate_value"] = self._value_validator.compile()
+            namespace["ValidationError"] = ValidationError
+            lines += [
+                "    items = {}",
+                "    for k, v in value.items():",
+                "        try:",
+                "            v = _validate_value(v)",
+                "        except ValidationError as ex:",
+                "            raise ex.add_error_path_item(k)",
+                "        items[{}] = v".format("k" if self._key_validator is None else "_validate_key(k)"),
+            ]
+        lines.append("    return items if value.__class__ is dict else value.__class__(items.items())")
+        return lines, namespace
+
+    def _validated_items(self, value):
+        """Return a dict of the validated keys and values of ``value``."""
         validate_key = validate_value = None
         if self._key_validator is not None:
             validate_key = self._key_validator.validate
         if self._value_validator is not None:
             validate_value = self._value_validator.validate
-        for k, v in iteritems(value):
-            if validate_value is not None:
-                try:
-                    v = validate_value(v)
-                except ValidationError as ex:
-                    raise ex.add_error_path_item(k)
+        if validate_value is None:
+            if validate_key is None:
+                return dict(value)
+            return {validate_key(k): v for k, v in value.items()}
+        items = {}
+        for k, v in value.items():
+            try:
+                v = validate_value(v)
+            except ValidationError as ex:
+                raise ex.add_error_path_item(k)
             if validate_key is not None:
                 k = validate_key(k)
-            yield (k, v)
+            items[k] = v
+        return items
+
+    def _iter_validated_items(self, value):
+        """Yield the validated ``(key, value)`` pairs of ``value``.
+
+        It is kept for the subclasses that override it, which are validated with
+        it instead of :py:meth:`_validated_items`.
+        """
+        yield from Mapping._validated_items(self, value).items()
 
 
 class Optional(object):
@@ -608,6 +1034,8 @@ class Optional(object):
     ``default`` can also be a zero-argument callable, in which case property value is set to ``default()``.
     """
 
+    __slots__ = ("key", "default")
+
     def __init__(self, key, default=UNDEFINED):
         self.key = key
         self.default = default
@@ -623,7 +1051,11 @@ class Object(Type):
     "properties", i.e. string keys.
     """
 
-    accept_types = collections.Mapping
+    accept_types = collections.abc.Mapping
+
+    #: Objects with more properties are validated by :py:meth:`validate` instead of
+    #: generated code, which binds a few names for each property
+    max_unrolled_properties = 64
 
     def __init__(self, properties=None, additional=True, ignore_optional_errors=False):
         """Instantiate an Object validator.
@@ -648,7 +1080,7 @@ class Object(Type):
         self._required_keys = set()
         if properties is None:
             properties = {}
-        for p, schema in iteritems(properties):
+        for p, schema in properties.items():
             if isinstance(p, Optional):
                 if p.default is not UNDEFINED:
                     self._optional_defaults[p.key] = p.default
@@ -657,70 +1089,210 @@ class Object(Type):
                 self._required_keys.add(p)
                 self._all.append((p, schema))
         self._all_keys = [p for p, _ in self._all]
+        self._all_keys_set = frozenset(self._all_keys)
         self._additional = additional
         self._ignore_optional_errors = ignore_optional_errors
         self._named_validators = None
+        self._property_validators = None
+        self._all_pure = False
 
     def parse(self):
         if hasattr(self, '_all'):
             if not isinstance(self._additional, bool) and self._additional is not REMOVE:
                 self._additional = self.val_context.parse(self._additional)
-            self._named_validators = [
+            self._named_validators = tuple(
                 (name, self.val_context.parse(schema))
                 for name, schema in self._all
-            ]
+            )
             del self._all
 
+    def freeze(self):
+        """Mark the parsed properties as required or optional, in declaration order.
+
+        The required properties are known to be present once the missing ones
+        have been reported, so they are validated without membership checks.
+        """
+        self._property_validators = tuple((name, validator.validate, name in self._required_keys)
+                                          for name, validator in self._named_validators)
+        # if no property is adapted, added or removed the value itself is the result
+        self._all_pure = (self._additional is True and not self._optional_defaults
+                          and not self._ignore_optional_errors
+                          and all(validator.is_pure for _, validator in self._named_validators))
+
+    @property
+    def is_pure(self):
+        return self._all_pure
+
     def validate(self, value):
         super(Object, self).validate(value)
-        missing_required = self._required_keys.difference(value)
-        if missing_required:
-            missing_required = list(imap(self.val_context.repr, missing_required))
-            raise ValidationError(self.val_context,
-                                  "missing required properties: [{}]".format(", ".join(missing_required)),
-                                  value)
-
-        result = value.copy()
-        for name, validator in self._named_validators:
-            if name in value:
+        if self._required_keys:
+            # difference(value) is about twice as fast as "- value.keys()"
+            missing_required = self._required_keys.difference(value)
+            if missing_required:
+                self._missing_required_error(value, missing_required)
+
+        if self._all_pure:
+            for name, validate, required in self._property_validators:
+                if required or name in value:
+                    try:
+                        validate(value[name])
+                    except ValidationError as ex:
+                        raise ex.add_error_path_item(name)
+            return value
+
+        all_keys = self._all_keys_set
+        if self._additional is REMOVE and value.__class__ is dict and not value.keys() <= all_keys:
+            # copy only the properties that are kept instead of deleting the others
+            result = {k: v for k, v in value.items() if k in all_keys}
+        else:
+            result = value.copy()
+        optional_defaults = self._optional_defaults
+        for name, validate, required in self._property_validators:
+            if required:
                 try:
-                    adapted = validator.validate(value[name])
-                    result[name] = adapted
+                    result[name] = validate(value[name])
                 except ValidationError as ex:
-                    if (not self._ignore_optional_errors
-                            or name in self._required_keys):
+                    raise ex.add_error_path_item(name)
+            elif name in value:
+                try:
+                    result[name] = validate(value[name])
+                except ValidationError as ex:
+                    if not self._ignore_optional_errors:
                         raise ex.add_error_path_item(name)
-                    else:
-                        del result[name]
-            elif name in self._optional_defaults:
-                default = self._optional_defaults[name]
+                    del result[name]
+            elif name in optional_defaults:
+                default = optional_defaults[name]
                 result[name] = default if not callable(default) else default()
 
-        if self._additional is not True:
-            all_keys = self._all_keys
+        if self._additional is not True and not value.keys() <= all_keys:
             additional_properties = [k for k in value if k not in all_keys]
-            if additional_properties:
-                if self._additional is False:
-                    raise ValidationError(
-                        self.val_context,
-                        "unexpected properties: {}".format(self.val_context.repr(additional_properties)),
-                        value)
-                elif self._additional is REMOVE:
+            if self._additional is False:
+                self._additional_error(value, additional_properties)
+            elif self._additional is REMOVE:
+                if value.__class__ is not dict:
                     for name in additional_properties:
                         del result[name]
-                else:
-                    additional_validate = self._additional.validate
-                    for name in additional_properties:
-                        try:
-                            adapted = additional_validate(value[name])
-                            result[name] = adapted
-                        except ValidationError as ex:
-                            raise ex.add_error_path_item(name)
+            else:
+                additional_validate = self._additional.validate
+                for name in additional_properties:
+                    try:
+                        adapted = additional_validate(value[name])
+                        result[name] = adapted
+                    except ValidationError as ex:
+                        raise ex.add_error_path_item(name)
 
         return result
 
+    def _missing_required_error(self, value, missing_required):
+        _repr = self.val_context.repr
+        raise ValidationError(self.val_context,
+                              lambda: "missing required properties: [{}]".format(
+                                  ", ".join(map(_repr, missing_required))),
+                              value)
+
+    def _additional_error(self, value, additional_properties):
+        _repr = self.val_context.repr
+        raise ValidationError(self.val_context,
+                              lambda: "unexpected properties: {}".format(_repr(additional_properties)),
+                              value)
+
+    def emit(self):
+        """Generate the body of a validation function for this object's properties.
+
+        The properties are unrolled into straight-line code and the validators of
+        the properties are compiled recursively.
+        """
+        if self._overrides(Object) or len(self._named_validators) > self.max_unrolled_properties:
+            return None
+        lines, namespace = self._emit_type_check()
+        namespace.update({
+            "_required": frozenset(self._required_keys),
+            "_all_keys": self._all_keys_set,
+            "ValidationError": ValidationError,
+        })
+        if self._required_keys:
+            lines += [
+                "    missing_required = _required.difference(value)",
+                "    if missing_required:",
+                "        _self._missing_required_error(value, missing_required)",
+            ]
+        # the value itself is the result if it is not changed
+        if self._all_pure:
+            store = "{1}(value[{0}])"
+        else:
+            store = "result[{0}] = {1}(value[{0}])"
+            if self._additional is REMOVE:
+                lines += [
+                    "    if value.__class__ is dict and not value.keys() <= _all_keys:",
+                    "        result = {k: v for k, v in value.items() if k in _all_keys}",
+                    "    else:",
+                    "        result = value.copy()",
+                ]
+            else:
+                lines.append("    result = value.copy()")
+        for i, (name, validator) in enumerate(self._named_validators):
+            key, validate = "_K{}".format(i), "_V{}".format(i)
+            namespace[key] = name
+            namespace[validate] = validator.compile()
+            if name in self._required_keys:
+                lines += [
+                    "    try:",
+                    "        " + store.format(key, validate),
+                    "    except ValidationError as ex:",
+                    "        raise ex.add_error_path_item({})".format(key),
+                ]
+                continue
+            lines += [
+                "    if {0} in value:".format(key),
+                "        try:",
+                "            " + store.format(key, validate),
+                "        except ValidationError as ex:",
+            ]
+            if self._ignore_optional_errors:
+                lines.append("            del result[{}]".format(key))
+            else:
+                lines.append("            raise ex.add_error_path_item({})".format(key))
+            if name in self._optional_defaults:
+                default = "_D{}".format(i)
+                namespace[default] = self._optional_defaults[name]
+                if callable(self._optional_defaults[name]):
+                    default += "()"
+                lines += [
+                    "    else:",
+                    "        result[{}] = {}".format(key, default),
+                ]
+        if self._additional is REMOVE:
+            # only the values of other classes are copied with their additional properties
+            lines += [
+                "    if value.__class__ is not dict and not value.keys() <= _all_keys:",
+                "        for name in [k for k in value if k not in _all_keys]:",
+                "            del result[name]",
+            ]
+        elif self._additional is not True:
+            lines += [
+                "    if not value.keys() <= _all_keys:",
+                "        additional_properties = [k for k in value if k not in _all_keys]",
+            ]
+            if self._additional is False:
+                lines.append("        _self._additional_error(value, additional_properties)")
+            else:
+                namespace["_A"] = self._additional.compile()
+                lines += [
+                    "        for name in additional_properties:",
+                    "            try:",
+                    "                result[name] = _A(value[name])",
+                    "            except ValidationError as ex:",
+                    "                raise ex.add_error_path_item(name)",
+                ]
+        lines.append("    return value" if self._all_pure else "    return result")
+        return lines, namespace
+
 
 class ObjectFactory(object):
+    #: The types of the schemas that it parses. Subclasses that parse other
+    #: schemas must override it, e.g. with ``None`` to be tried for every schema.
+    schema_types = (dict,)
+
     def __init__(self, additional_properties=True, ignore_optional_property_errors=False):
         """
         :param additional_properties: Specifies for this parse call the schema of
@@ -738,8 +1310,28 @@ class ObjectFactory(object):
             - ``True`` to ignore invalid optional properties.
             - ``False`` to raise ValidationError for invalid optional properties.
         """
-        self.additional_properties = additional_properties
-        self.ignore_optional_property_errors = ignore_optional_property_errors
+        self._additional_properties = additional_properties
+        self._ignore_optional_property_errors = ignore_optional_property_errors
+
+    # the cached validators of the contexts are discarded when an option changes
+
+    @property
+    def additional_properties(self):
+        return self._additional_properties
+
+    @additional_properties.setter
+    def additional_properties(self, value):
+        self._additional_properties = value
+        _parsing_options_changed()
+
+    @property
+    def ignore_optional_property_errors(self):
+        return self._ignore_optional_property_errors
+
+    @ignore_optional_property_errors.setter
+    def ignore_optional_property_errors(self, value):
+        self._ignore_optional_property_errors = value
+        _parsing_options_changed()
 
     def __call__(self, obj):
         """